@@ -0,0 +1,354 @@
+"""Audit the indexes of the model tables against the sort and filter fields of the managers.
+
+Usage: `python -m app.database.audit [--generate] [--include-unused]`
+
+Reads the live indexes of the tables in `Base.metadata` from `pg_index` and `pg_stat_user_indexes` and reports:
+
+- `duplicate`: an index whose keys are a prefix of another index, e.g. a plain index on the primary key;
+- `invalid`: an index left behind by a failed `CREATE INDEX CONCURRENTLY`;
+- `unused`: a non-unique index without scans since the statistics were reset that no sort or filter field needs;
+- `missing`: a sort field of `BaseManager.sort_fields` or a filter of `BaseManager.filter_schema` without an index.
+
+`--generate` writes an Alembic migration that creates and drops the reported indexes `CONCURRENTLY`, `unused` indexes
+only with `--include-unused`. The report is written to stdout as JSON, and the command exits with status 1 when there
+is anything to migrate.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from alembic.script import ScriptDirectory
+from sqlalchemy import Text, text
+from sqlalchemy.dialects import postgresql
+
+from app.database.base import metadata
+from app.database.engine import session_manager
+from app.manager.base import BaseManager
+from app.utils.constants import PROJECT_DIR
+from app.utils.filters import FilterOperator
+from app.utils.warmup import MANAGERS
+
+MIGRATIONS_DIR = PROJECT_DIR / "database" / "migrations"
+PREFIX_OPCLASS = "text_pattern_ops"
+MIGRATION_LINE_LENGTH = 120
+
+QUOTE = postgresql.dialect().identifier_preparer.quote
+
+INDEXES_QUERY = text("""
+SELECT
+    t.relname AS table_name,
+    i.relname AS name,
+    am.amname AS method,
+    ARRAY(SELECT pg_get_indexdef(x.indexrelid, k, true) FROM generate_series(1, x.indnkeyatts) AS k) AS columns,
+    ARRAY(
+        SELECT coalesce(o.opcname, '')
+        FROM unnest(x.indclass) WITH ORDINALITY AS c(oid, position)
+        LEFT JOIN pg_opclass o ON o.oid = c.oid AND NOT o.opcdefault
+        ORDER BY c.position
+    ) AS opclasses,
+    x.indisunique AS is_unique,
+    x.indisvalid AS is_valid,
+    x.indpred IS NOT NULL AS is_partial,
+    EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = x.indexrelid) AS is_constraint,
+    coalesce(s.idx_scan, 0) AS scans,
+    pg_relation_size(x.indexrelid) AS size_bytes,
+    pg_get_indexdef(x.indexrelid) AS definition
+FROM pg_index x
+JOIN pg_class t ON t.oid = x.indrelid
+JOIN pg_class i ON i.oid = x.indexrelid
+JOIN pg_am am ON am.oid = i.relam
+JOIN pg_namespace n ON n.oid = t.relnamespace
+LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = x.indexrelid
+WHERE n.nspname = current_schema() AND t.relname = ANY(:tables)
+ORDER BY t.relname, i.relname
+""")
+STATS_RESET_QUERY = text("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+
+MIGRATION_TEMPLATE = '''"""{message}
+
+Revision ID: {revision}
+Revises: {down_revision}
+Create Date: {created_at}
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "{revision}"
+down_revision: str | None = "{down_revision}"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+{upgrade}
+{downgrade}
+
+
+def upgrade() -> None:
+    # Generated by `python -m app.database.audit --generate`. CONCURRENTLY does not block writes and cannot run in a
+    # transaction.
+    with op.get_context().autocommit_block():
+        for statement in UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for statement in DOWNGRADE:
+            op.execute(statement)
+'''
+
+type IndexKey = tuple[str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class LiveIndex:
+    table_name: str
+    name: str
+    method: str
+    keys: tuple[IndexKey, ...]
+    is_unique: bool
+    is_valid: bool
+    is_partial: bool
+    is_constraint: bool
+    scans: int
+    size_bytes: int
+    definition: str
+
+    def starts_with(self, keys: tuple[IndexKey, ...]) -> bool:
+        return self.is_valid and not self.is_partial and self.keys[: len(keys)] == keys
+
+    def is_covered_by(self, other: "LiveIndex") -> bool:
+        # Indexes backing a primary key or unique constraint are never dropped; of two identical indexes the unique
+        # one, or else the first by name, is kept.
+        if other.name == self.name or other.method != self.method or self.is_constraint or self.is_partial:
+            return False
+
+        if not other.starts_with(self.keys):
+            return False
+
+        if self.is_unique:
+            return (
+                other.is_unique
+                and len(other.keys) == len(self.keys)
+                and (other.is_constraint or other.name < self.name)
+            )
+
+        return len(other.keys) > len(self.keys) or other.is_unique or other.name < self.name
+
+
+@dataclass(frozen=True, slots=True)
+class ExpectedIndex:
+    table_name: str
+    name: str
+    keys: tuple[IndexKey, ...]
+    columns_sql: str
+    reason: str
+
+
+@dataclass(slots=True)
+class Finding:
+    kind: str
+    table_name: str
+    index: str
+    reason: str
+    declared: bool = False
+    scans: int | None = None
+    size_bytes: int | None = None
+    upgrade: list[str] = field(default_factory=list)
+    downgrade: list[str] = field(default_factory=list)
+
+
+def _expected_indexes(manager: BaseManager[Any, Any, Any]) -> list[ExpectedIndex]:
+    table = manager.db_model.__table__
+    expected: dict[tuple[IndexKey, ...], ExpectedIndex] = {}
+
+    def expect(keys: tuple[IndexKey, ...], name: str, columns_sql: str, reason: str) -> None:
+        expected.setdefault(keys, ExpectedIndex(table.name, f"ix_{table.name}_{name}", keys, columns_sql, reason))
+
+    def expect_columns(columns: tuple[str, ...], reason: str) -> None:
+        expect(
+            tuple((QUOTE(column), "") for column in columns), "_".join(columns), ", ".join(map(QUOTE, columns)), reason
+        )
+
+    for sort_field in sorted(manager.sort_fields):
+        column = table.columns[sort_field]
+        # Keyset pages order by `(field, id)`, a unique field needs no tiebreaker.
+        expect_columns(
+            (sort_field,) if column.primary_key or column.unique else (sort_field, "id"), f"sort {sort_field}"
+        )
+
+    for filter_field, attribute, operator in manager.filter_spec:
+        column = table.columns[attribute.key]
+
+        if operator is FilterOperator.PREFIX:
+            # `pg_get_indexdef` renders the implicit cast of a varchar column to the text argument of `lower`.
+            cast = "" if isinstance(column.type, Text) else "::text"
+            expect(
+                ((f"lower({QUOTE(column.key)}{cast})", PREFIX_OPCLASS),),
+                f"{column.key}_lower_pattern",
+                f"lower({QUOTE(column.key)}) {PREFIX_OPCLASS}",
+                f"filter {filter_field}",
+            )
+        else:
+            expect_columns((column.key,), f"filter {filter_field}")
+
+    # An index also serves every prefix of its keys, e.g. `(created_at, id)` serves a `created_at` range filter.
+    return [
+        index
+        for keys, index in expected.items()
+        if not any(other[: len(keys)] == keys and len(other) > len(keys) for other in expected)
+    ]
+
+
+def _create_statement(index: ExpectedIndex) -> str:
+    return f"CREATE INDEX CONCURRENTLY {QUOTE(index.name)} ON {QUOTE(index.table_name)} ({index.columns_sql})"
+
+
+def _drop_statement(name: str) -> str:
+    return f"DROP INDEX CONCURRENTLY IF EXISTS {QUOTE(name)}"
+
+
+def _drop_finding(kind: str, index: LiveIndex, reason: str, declared: set[str]) -> Finding:
+    return Finding(
+        kind=kind,
+        table_name=index.table_name,
+        index=index.name,
+        reason=reason,
+        declared=index.name in declared,
+        scans=index.scans,
+        size_bytes=index.size_bytes,
+        upgrade=[_drop_statement(index.name)],
+        downgrade=[] if kind == "invalid" else [index.definition.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)],
+    )
+
+
+def audit(live: list[LiveIndex], managers: tuple[BaseManager[Any, Any, Any], ...]) -> list[Finding]:
+    declared = {str(index.name) for table in metadata.tables.values() for index in table.indexes if index.name}
+    expected = [index for manager in managers for index in _expected_indexes(manager)]
+    findings: list[Finding] = []
+
+    for index in live:
+        same_table = [other for other in live if other.table_name == index.table_name]
+
+        if not index.is_valid:
+            findings.append(_drop_finding("invalid", index, "failed concurrent build", declared))
+        elif covering := next((other for other in same_table if index.is_covered_by(other)), None):
+            findings.append(_drop_finding("duplicate", index, f"covered by {covering.name}", declared))
+        elif (
+            index.scans == 0
+            and not index.is_unique
+            and not any(index.starts_with(needed.keys) for needed in expected if needed.table_name == index.table_name)
+        ):
+            findings.append(_drop_finding("unused", index, "no scans since statistics reset", declared))
+
+    findings.extend(
+        Finding(
+            kind="missing",
+            table_name=needed.table_name,
+            index=needed.name,
+            reason=needed.reason,
+            declared=needed.name in declared,
+            upgrade=[_drop_statement(needed.name), _create_statement(needed)],
+            downgrade=[_drop_statement(needed.name)],
+        )
+        for needed in expected
+        if not any(index.table_name == needed.table_name and index.starts_with(needed.keys) for index in live)
+    )
+
+    return findings
+
+
+async def fetch_live_indexes() -> tuple[list[LiveIndex], datetime | None]:
+    async with session_manager.session() as session:
+        rows = (await session.execute(INDEXES_QUERY, {"tables": list(metadata.tables)})).mappings().all()
+        stats_reset = (await session.execute(STATS_RESET_QUERY)).scalar()
+
+    indexes = [
+        LiveIndex(
+            table_name=row["table_name"],
+            name=row["name"],
+            method=row["method"],
+            keys=tuple(zip(row["columns"], row["opclasses"], strict=True)),
+            is_unique=row["is_unique"],
+            is_valid=row["is_valid"],
+            is_partial=row["is_partial"],
+            is_constraint=row["is_constraint"],
+            scans=row["scans"],
+            size_bytes=row["size_bytes"],
+            definition=row["definition"],
+        )
+        for row in rows
+    ]
+    return indexes, stats_reset
+
+
+def _render_statements(name: str, statements: list[str]) -> str:
+    # Rendered the way the formatter of the project writes them: double quotes unless the statement quotes identifiers,
+    # and one line when it fits.
+    literals = [repr(statement) if '"' in statement else f'"{statement}"' for statement in statements]
+    line = f"{name} = ({', '.join(literals)}{',' if len(literals) == 1 else ''})"
+
+    if len(line) <= MIGRATION_LINE_LENGTH:
+        return line
+
+    return f"{name} = (\n" + "".join(f"    {literal},\n" for literal in literals) + ")"
+
+
+def generate_migration(findings: list[Finding], message: str) -> str:
+    script = ScriptDirectory(str(MIGRATIONS_DIR))
+    revision = uuid.uuid4().hex[:12]
+    created_at = datetime.now(UTC)
+    down_revision = script.get_current_head()
+    slug = message.lower().replace("-", "_").replace(" ", "_")
+    path = MIGRATIONS_DIR / "versions" / f"{created_at:%Y_%m_%d_%H%M}-{revision}_{slug}.py"
+
+    path.write_text(
+        MIGRATION_TEMPLATE.format(
+            message=message,
+            revision=revision,
+            down_revision=down_revision,
+            created_at=created_at.replace(tzinfo=None),
+            upgrade=_render_statements("UPGRADE", [statement for finding in findings for statement in finding.upgrade]),
+            downgrade=_render_statements(
+                "DOWNGRADE", [statement for finding in reversed(findings) for statement in finding.downgrade]
+            ),
+        )
+    )
+    return str(path)
+
+
+async def main(args: argparse.Namespace) -> bool:
+    try:
+        live, stats_reset = await fetch_live_indexes()
+    finally:
+        await session_manager.close_connection()
+
+    findings = audit(live, MANAGERS)
+    actionable = [finding for finding in findings if finding.kind != "unused" or args.include_unused]
+    report: dict[str, Any] = {
+        "stats_reset": stats_reset.isoformat() if stats_reset else None,
+        "findings": [asdict(finding) for finding in findings],
+    }
+
+    if args.generate and actionable:
+        report["migration"] = generate_migration(actionable, args.message)
+
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    return not actionable
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--generate", action="store_true", help="write an Alembic migration for the findings")
+    parser.add_argument("--include-unused", action="store_true", help="also drop unused indexes")
+    parser.add_argument("--message", default="audit-indexes", help="migration message")
+    sys.exit(0 if asyncio.run(main(parser.parse_args())) else 1)
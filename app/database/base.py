@@ -9,8 +9,10 @@ metadata = Base.metadata
 
 class BaseDBModel(Base):
     __abstract__ = True
+    # Server-generated values are fetched with RETURNING in the INSERT or UPDATE itself rather than on next access.
+    __mapper_args__ = {"eager_defaults": True}  # noqa: RUF012
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
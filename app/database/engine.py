@@ -1,33 +1,140 @@
-from collections.abc import AsyncIterator
+import random
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from typing import Any
 
+from fastapi import Request
+from sqlalchemy import Engine, TextClause, event, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool
+from sqlalchemy.sql.dml import UpdateBase
 
+from app.database.instrumentation import InstrumentedQueuePool, instrument_engine
 from app.exceptions.database import DatabaseInitializationError
 from app.settings import settings
 
+PRIMARY_PIN_COOKIE = "db_primary_pin"
+
+
+class RoutingSession(Session):
+    def __init__(
+        self, *args: Any, replicas: Sequence[Engine] = (), read_only: bool = False, pinned: bool = False, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        # One replica per session, so all its reads see the same snapshot lag and share one pooled connection.
+        self.replica = random.choice(replicas) if replicas else None
+        self.read_only = read_only
+        self.pinned = pinned
+        self.has_writes = False
+
+    def get_bind(self, mapper: Any = None, *, clause: Any = None, **kwargs: Any) -> Any:
+        # Only read-only sessions use replicas; a read-write session reads from the primary, so the rows it updates or
+        # deletes are never stale.
+        if self.replica is not None and self.read_only and not self.pinned:
+            return self.replica
+
+        if not self.read_only:
+            # ORM flushes pass no clause; text statements are counted as writes since they may modify rows.
+            self.has_writes = self.has_writes or self._flushing or isinstance(clause, UpdateBase | TextClause)
+
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@dataclass(slots=True)
+class PrimaryPin:
+    requested: bool = False
+
+
+primary_pin: ContextVar[PrimaryPin | None] = ContextVar("primary_pin", default=None)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def pin_client_to_primary(session: Session) -> None:
+    pin = primary_pin.get()
+
+    if pin is not None and isinstance(session, RoutingSession) and session.replicas and session.has_writes:
+        pin.requested = True
+
+
+def pool_limits(connection_budget: int, workers: int) -> tuple[int, int]:
+    # Every worker process gets an equal share of the budget, two thirds kept open and the rest as overflow.
+    share = max(connection_budget // max(workers, 1), 1)
+    pool_size = max(share * 2 // 3, 1)
+    return pool_size, share - pool_size
+
 
 class DatabaseSessionManager:
-    def __init__(self, db_url: str, engine_kwargs: dict[str, Any] | None = None) -> None:
-        self._engine: AsyncEngine | None = create_async_engine(
-            db_url, pool_size=30, pool_pre_ping=True, pool_recycle=1800, max_overflow=15, **(engine_kwargs or {})
-        )
-        self.session_maker: async_sessionmaker[AsyncSession] | None = async_sessionmaker(
-            autocommit=False,
-            expire_on_commit=False,
-            bind=self._engine,
+    def __init__(
+        self, db_url: str, engine_kwargs: dict[str, Any] | None = None, replica_urls: Sequence[str] = ()
+    ) -> None:
+        self._db_url = db_url
+        self._replica_urls = tuple(replica_urls)
+        self._engine_kwargs = {
+            "pool_pre_ping": True,
+            "pool_recycle": settings.db_pool_recycle_seconds,
+            "pool_timeout": settings.db_pool_timeout_seconds,
+            **({"poolclass": InstrumentedQueuePool} if settings.sql_instrumentation else {}),
+            **(engine_kwargs or {}),
+        }
+        self._closed = False
+        self._engine: AsyncEngine | None = None
+        self._replica_engines: list[AsyncEngine] = []
+        self._session_maker: async_sessionmaker[AsyncSession] | None = None
+        # The job worker's share is taken out of the budget, so the API and the worker together stay within it.
+        self.set_pool_limits(
+            settings.db_connection_budget - settings.jobs_db_connection_budget, settings.server_workers
         )
 
-    async def get_session(self) -> AsyncIterator[AsyncSession]:
-        if self.session_maker is None:
+    def set_pool_limits(self, connection_budget: int, workers: int) -> None:
+        # Takes effect when the engines are created, on first use.
+        self.pool_size, self.max_overflow = pool_limits(connection_budget, workers)
+        self._engine_kwargs.update(pool_size=self.pool_size, max_overflow=self.max_overflow)
+
+    def _connect(self) -> async_sessionmaker[AsyncSession]:
+        # Engines are created on first use, so importing the app neither loads the driver nor builds the pools.
+        if self._closed:
             raise DatabaseInitializationError
 
-        session = self.session_maker()
+        if self._session_maker is None:
+            self._engine = create_async_engine(self._db_url, **self._engine_kwargs)
+            self._replica_engines = [
+                create_async_engine(replica_url, **self._engine_kwargs) for replica_url in self._replica_urls
+            ]
+
+            if settings.sql_instrumentation:
+                for engine in (self._engine, *self._replica_engines):
+                    instrument_engine(engine.sync_engine)
+
+            self._session_maker = async_sessionmaker(
+                autocommit=False,
+                expire_on_commit=False,
+                bind=self._engine,
+                sync_session_class=RoutingSession,
+                replicas=[replica_engine.sync_engine for replica_engine in self._replica_engines],
+            )
+
+        return self._session_maker
+
+    @property
+    def session_maker(self) -> async_sessionmaker[AsyncSession]:
+        return self._connect()
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._connect().kw["bind"]
+
+    @asynccontextmanager
+    async def session(self, *, read_only: bool = False, pinned: bool = False) -> AsyncIterator[AsyncSession]:
+        session = self.session_maker(read_only=read_only, pinned=pinned)
         try:
             yield session
         except Exception:
@@ -36,13 +143,44 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
-    async def close_connection(self) -> None:
+    async def get_session(self) -> AsyncIterator[AsyncSession]:
+        async with self.session() as session:
+            yield session
+
+    async def get_read_session(self, request: Request) -> AsyncIterator[AsyncSession]:
+        async with self.session(read_only=True, pinned=PRIMARY_PIN_COOKIE in request.cookies) as session:
+            yield session
+
+    @property
+    def pools(self) -> dict[str, Pool]:
         if self._engine is None:
+            return {}
+
+        replicas = {f"replica-{index}": engine.pool for index, engine in enumerate(self._replica_engines)}
+        return {"primary": self._engine.pool, **replicas}
+
+    @property
+    def has_replicas(self) -> bool:
+        return bool(self._replica_urls)
+
+    async def ping(self) -> None:
+        async with self.engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def close_connection(self) -> None:
+        if self._closed:
             raise DatabaseInitializationError
-        await self._engine.dispose()
 
+        if self._engine is not None:
+            for engine in (self._engine, *self._replica_engines):
+                await engine.dispose()
+
+        self._closed = True
         self._engine = None
-        self.session_maker = None
+        self._replica_engines = []
+        self._session_maker = None
 
 
-session_manager: DatabaseSessionManager = DatabaseSessionManager(settings.db_url, {"echo": settings.echo_sql})
+session_manager: DatabaseSessionManager = DatabaseSessionManager(
+    settings.db_url, {"echo": settings.echo_sql}, settings.db_replica_urls
+)
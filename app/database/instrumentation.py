@@ -0,0 +1,124 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine.interfaces import CacheStats, DBAPICursor, ExceptionContext, ExecutionContext
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from app.exceptions.database import RepeatedStatementError
+from app.settings import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class QueryStats:
+    statements: int = 0
+    rows: int = 0
+    db_time: float = 0.0
+    pool_wait: float = 0.0
+    cache_hits: int = 0
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.statements} statements, {self.rows} rows", '
+            f"db-pool;dur={self.pool_wait * 1000:.2f}"
+        )
+
+
+@dataclass(slots=True)
+class CompiledCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / total if (total := self.hits + self.misses) else 0.0
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+compiled_cache_stats = CompiledCacheStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.perf_counter() - started_at
+            metrics.db_pool_wait.observe(wait)
+
+            if (stats := query_stats.get()) is not None:
+                stats.pool_wait += wait
+
+
+def _before_cursor_execute(
+    conn: Any,
+    cursor: DBAPICursor,  # noqa: ARG001
+    statement: str,
+    parameters: Any,  # noqa: ARG001
+    context: ExecutionContext | None,  # noqa: ARG001
+    executemany: bool,  # noqa: ARG001, FBT001
+) -> None:
+    if (stats := query_stats.get()) is None:
+        return
+
+    stats.shapes[statement] += 1
+
+    if stats.shapes[statement] == settings.sql_repeat_threshold + 1:
+        if settings.sql_repeat_raise:
+            raise RepeatedStatementError(statement, settings.sql_repeat_threshold)
+
+        logger.warning(
+            "Statement executed more than %d times in one request, possible N+1: %s",
+            settings.sql_repeat_threshold,
+            statement,
+        )
+
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any,
+    cursor: DBAPICursor,
+    statement: str,  # noqa: ARG001
+    parameters: Any,  # noqa: ARG001
+    context: ExecutionContext | None,
+    executemany: bool,  # noqa: ARG001, FBT001
+) -> None:
+    cache_hit = context is not None and getattr(context, "cache_hit", None) is CacheStats.CACHE_HIT
+
+    if cache_hit:
+        compiled_cache_stats.hits += 1
+
+    else:
+        compiled_cache_stats.misses += 1
+
+    if (stats := query_stats.get()) is None or not conn.info.get("query_started_at"):
+        return
+
+    stats.statements += 1
+    stats.cache_hits += cache_hit
+    stats.rows += max(cursor.rowcount, 0)
+    stats.db_time += time.perf_counter() - conn.info["query_started_at"].pop()
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # A failed statement never reaches `after_cursor_execute`, so its start time would stay on the pooled connection.
+    if context.connection is not None and context.connection.info.get("query_started_at"):
+        context.connection.info["query_started_at"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
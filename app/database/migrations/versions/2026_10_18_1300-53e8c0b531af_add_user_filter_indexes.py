@@ -0,0 +1,41 @@
+"""add-user-filter-indexes
+
+Revision ID: 53e8c0b531af
+Revises: e00141056a92
+Create Date: 2026-10-18 13:00:12.481920
+
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "53e8c0b531af"
+down_revision: str | None = "e00141056a92"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+INDEXES: dict[str, list[str | sa.ColumnElement[Any]]] = {
+    "ix_user_created_at_id": ["created_at", "id"],
+    "ix_user_updated_at_id": ["updated_at", "id"],
+    "ix_user_email_lower_pattern": [sa.literal_column("lower(email) text_pattern_ops")],
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY builds do not block writes but cannot run in a transaction, and a failed build leaves an invalid
+    # index behind, so each index is dropped first to make a failed upgrade safe to rerun.
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.drop_index(name, table_name="user", postgresql_concurrently=True, if_exists=True)
+            op.create_index(name, "user", columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in reversed(INDEXES):
+            op.drop_index(name, table_name="user", postgresql_concurrently=True, if_exists=True)
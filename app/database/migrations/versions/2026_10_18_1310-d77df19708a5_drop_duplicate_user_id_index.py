@@ -0,0 +1,34 @@
+"""drop-duplicate-user-id-index
+
+Revision ID: d77df19708a5
+Revises: 53e8c0b531af
+Create Date: 2026-10-18 13:10:39.388500
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d77df19708a5"
+down_revision: str | None = "53e8c0b531af"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+UPGRADE = ("DROP INDEX CONCURRENTLY IF EXISTS ix_user_id",)
+DOWNGRADE = ('CREATE INDEX CONCURRENTLY ix_user_id ON public."user" USING btree (id)',)
+
+
+def upgrade() -> None:
+    # Generated by `python -m app.database.audit --generate`. CONCURRENTLY does not block writes and cannot run in a
+    # transaction.
+    with op.get_context().autocommit_block():
+        for statement in UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for statement in DOWNGRADE:
+            op.execute(statement)
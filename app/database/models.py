@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database.base import BaseDBModel
@@ -9,3 +9,13 @@ class User(BaseDBModel):
 
     email: Mapped[str] = mapped_column(String(100), unique=True, index=True)
     password: Mapped[str] = mapped_column(String(100), nullable=False)
+
+
+# Keyset pages order by `(column, id)`, and the prefix filter on `email` is a byte-wise range on `lower(email)`.
+Index("ix_user_created_at_id", User.created_at, User.id)
+Index("ix_user_updated_at_id", User.updated_at, User.id)
+Index(
+    "ix_user_email_lower_pattern",
+    func.lower(User.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"},
+)
@@ -14,5 +14,5 @@ if [ "$ENV" = "local" ]; then
 elif [ "$ENV" = "dev" ]; then
   uvicorn main:app --loop uvloop --reload --log-level debug --timeout-graceful-shutdown 5 --host 0.0.0.0 --port 80
 else
-  uvicorn main:app --loop uvloop --log-level info --timeout-graceful-shutdown 5 --host 0.0.0.0 --port 80
+  exec python -m app.server
 fi
@@ -1,3 +1,8 @@
 class DatabaseInitializationError(Exception):
     def __init__(self) -> None:
         super().__init__("Database is not initialized.")
+
+
+class RepeatedStatementError(Exception):
+    def __init__(self, statement: str, threshold: int) -> None:
+        super().__init__(f"Statement executed more than {threshold} times in one request: {statement}")
@@ -0,0 +1,3 @@
+class SessionNotLoadedError(Exception):
+    def __init__(self) -> None:
+        super().__init__("Session is not loaded, depend on HTTPSessionDependency to access it.")
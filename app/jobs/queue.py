@@ -0,0 +1,40 @@
+import json
+import uuid
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from typing import Any
+
+from app.utils.cache import async_redis
+from app.utils.constants import JOBS_STREAM_KEY
+
+type JobFunction = Callable[..., Awaitable[Any]]
+
+JOBS: dict[str, JobFunction] = {}
+
+
+def job[FunctionType: JobFunction](func: FunctionType) -> FunctionType:
+    JOBS[func.__name__] = func
+    return func
+
+
+def job_message(name: str, kwargs: Mapping[str, Any]) -> dict[str, str]:
+    return {"id": uuid.uuid4().hex, "name": name, "kwargs": json.dumps(kwargs), "attempt": "1"}
+
+
+async def enqueue(func: JobFunction, /, **kwargs: Any) -> str:
+    return (await enqueue_many(func, [kwargs]))[0]
+
+
+async def enqueue_many(
+    func: JobFunction,
+    kwargs_list: Iterable[Mapping[str, Any]],
+    *,
+    stream: str = JOBS_STREAM_KEY,
+) -> list[str]:
+    messages = [job_message(func.__name__, kwargs) for kwargs in kwargs_list]
+
+    async with async_redis().pipeline(transaction=False) as pipeline:
+        for message in messages:
+            pipeline.xadd(stream, message)  # type: ignore[arg-type]
+        await pipeline.execute()
+
+    return [message["id"] for message in messages]
@@ -0,0 +1,15 @@
+from typing import Any
+
+from app.database.engine import session_manager
+from app.jobs.queue import job
+from app.manager.user import user_manager
+from app.schemas.user import UserImport
+
+
+@job
+async def import_users(users: list[dict[str, Any]]) -> None:
+    # Passwords arrive hashed, so the rows are inserted as they are.
+    payload = [UserImport.model_validate(user).model_dump() for user in users]
+
+    async with session_manager.session() as session:
+        await user_manager.insert_bulk(payload, session)
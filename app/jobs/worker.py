@@ -0,0 +1,243 @@
+"""Background job worker.
+
+Usage: `python -m app.jobs.worker`
+
+Jobs are entries of a Redis stream read through a consumer group, so any number of worker processes share the load.
+A worker reads up to `JOBS_BATCH_SIZE` jobs per round trip, runs at most `JOBS_CONCURRENCY` of them at once and
+acknowledges finished jobs in one pipeline per loop. A failed job is moved to a sorted set and re-added to the stream
+after an exponential backoff; after `JOBS_MAX_ATTEMPTS` it is moved to the `<stream>:dead` stream instead. Jobs left
+unacknowledged for `JOBS_VISIBILITY_TIMEOUT_SECONDS` by a crashed worker are claimed by another one and count as a
+failed attempt. A job may run more than once, so job functions must be idempotent.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import time
+
+import uvloop
+from redis.exceptions import RedisError, ResponseError
+
+import app.jobs.tasks  # noqa: F401
+from app.database.engine import session_manager
+from app.jobs.queue import JOBS
+from app.settings import settings
+from app.utils.cache import async_redis
+from app.utils.constants import (
+    JOBS_CONSUMER_GROUP,
+    JOBS_DEAD_MAX_LENGTH,
+    JOBS_PROMOTE_BATCH_SIZE,
+    JOBS_STREAM_KEY,
+    LOG_FORMAT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Moves due retries from the sorted set back to the stream atomically, so a crash never loses or duplicates a job.
+PROMOTE_SCRIPT = """
+local due = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, tonumber(ARGV[2]))
+
+for _, payload in ipairs(due) do
+    local message = cjson.decode(payload)
+    redis.call(
+        "XADD", KEYS[2], "*",
+        "id", message.id, "name", message.name, "kwargs", message.kwargs, "attempt", message.attempt
+    )
+    redis.call("ZREM", KEYS[1], payload)
+end
+
+return #due
+"""
+
+type Message = tuple[str, dict[str, str]]
+
+
+class Worker:
+    def __init__(
+        self,
+        *,
+        stream: str = JOBS_STREAM_KEY,
+        concurrency: int = settings.jobs_concurrency,
+        batch_size: int = settings.jobs_batch_size,
+        block_ms: int = settings.jobs_block_ms,
+        max_attempts: int = settings.jobs_max_attempts,
+        visibility_timeout_seconds: int = settings.jobs_visibility_timeout_seconds,
+    ) -> None:
+        self.stream = stream
+        self.delayed_key = f"{stream}:delayed"
+        self.dead_key = f"{stream}:dead"
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.max_attempts = max_attempts
+        self.visibility_timeout_seconds = visibility_timeout_seconds
+        self.processed = 0
+        self.failed = 0
+        self._running: dict[str, asyncio.Task[None]] = {}
+        self._acks: list[str] = []
+        self._stopping = asyncio.Event()
+        self._redis = async_redis()
+        self._promote = self._redis.register_script(PROMOTE_SCRIPT)
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        await self._create_group()
+        claim_at = time.monotonic()
+
+        while not self._stopping.is_set():
+            try:
+                if len(self._running) >= self.concurrency:
+                    await asyncio.wait(self._running.values(), return_when=asyncio.FIRST_COMPLETED)
+
+                await self._flush()
+                free = self.concurrency - len(self._running)
+
+                if time.monotonic() >= claim_at:
+                    await self._fail_stale(free)
+                    claim_at = time.monotonic() + self.visibility_timeout_seconds / 2
+
+                for message_id, fields in await self._read(min(free, self.batch_size)):
+                    self._start(message_id, fields)
+            except RedisError as exc:
+                logger.warning("Job queue is unavailable: %r", exc)
+                await asyncio.sleep(self.block_ms / 1000)
+
+        await self._drain()
+
+    async def _create_group(self) -> None:
+        try:
+            await self._redis.xgroup_create(self.stream, JOBS_CONSUMER_GROUP, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def _read(self, count: int) -> list[Message]:
+        response = await self._redis.xreadgroup(
+            JOBS_CONSUMER_GROUP,
+            self.consumer,
+            {self.stream: ">"},
+            count=count,
+            block=self.block_ms,
+        )
+        return [message for messages in (response or {}).values() for message in messages[0]]
+
+    async def _fail_stale(self, count: int) -> None:
+        response = await self._redis.xautoclaim(
+            self.stream,
+            JOBS_CONSUMER_GROUP,
+            self.consumer,
+            min_idle_time=self.visibility_timeout_seconds * 1000,
+            count=count,
+        )
+
+        for message_id, fields in response[1]:
+            if message_id not in self._running:
+                await self._fail(message_id, fields, "Visibility timeout expired")
+
+    async def _flush(self) -> None:
+        acks, self._acks = self._acks, []
+
+        try:
+            async with self._redis.pipeline(transaction=False) as pipeline:
+                if acks:
+                    pipeline.xack(self.stream, JOBS_CONSUMER_GROUP, *acks)
+                    pipeline.xdel(self.stream, *acks)
+                await self._promote(
+                    keys=[self.delayed_key, self.stream],
+                    args=[time.time(), JOBS_PROMOTE_BATCH_SIZE],
+                    client=pipeline,
+                )
+                await pipeline.execute()
+        except RedisError:
+            self._acks.extend(acks)
+            raise
+
+    def _start(self, message_id: str, fields: dict[str, str]) -> None:
+        task = asyncio.create_task(self._execute(message_id, fields))
+        self._running[message_id] = task
+        task.add_done_callback(lambda _: self._running.pop(message_id, None))
+
+    async def _execute(self, message_id: str, fields: dict[str, str]) -> None:
+        try:
+            # A job outliving the visibility timeout would be claimed and run again by another worker.
+            async with asyncio.timeout(self.visibility_timeout_seconds):
+                await JOBS[fields["name"]](**json.loads(fields["kwargs"]))
+        except Exception as exc:
+            logger.exception("Job %s %s failed on attempt %s", fields["name"], fields["id"], fields["attempt"])
+            await self._fail(message_id, fields, repr(exc))
+        else:
+            self.processed += 1
+            self._acks.append(message_id)
+
+    async def _fail(self, message_id: str, fields: dict[str, str], error: str) -> None:
+        self.failed += 1
+        attempt = int(fields["attempt"])
+
+        async with self._redis.pipeline(transaction=True) as pipeline:
+            if attempt < self.max_attempts:
+                backoff = min(
+                    settings.jobs_retry_backoff_seconds * 2 ** (attempt - 1),
+                    settings.jobs_retry_backoff_max_seconds,
+                )
+                retry_at = time.time() + backoff * random.uniform(0.5, 1)
+                pipeline.zadd(self.delayed_key, {json.dumps({**fields, "attempt": str(attempt + 1)}): retry_at})
+            else:
+                pipeline.xadd(
+                    self.dead_key,
+                    {**fields, "error": error},  # type: ignore[dict-item]
+                    maxlen=JOBS_DEAD_MAX_LENGTH,
+                    approximate=True,
+                )
+            pipeline.xack(self.stream, JOBS_CONSUMER_GROUP, message_id)
+            pipeline.xdel(self.stream, message_id)
+            await pipeline.execute()
+
+    async def _drain(self) -> None:
+        pending: set[asyncio.Task[None]] = set()
+
+        if self._running:
+            _, pending = await asyncio.wait(
+                self._running.values(),
+                timeout=settings.jobs_graceful_shutdown_seconds,
+            )
+            # Cancelled jobs stay unacknowledged and are claimed by another worker after the visibility timeout.
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        await self._flush()
+
+        if not pending:
+            await self._redis.xgroup_delconsumer(self.stream, JOBS_CONSUMER_GROUP, self.consumer)
+
+
+async def serve() -> None:
+    session_manager.set_pool_limits(settings.jobs_db_connection_budget, 1)
+    worker = Worker()
+    loop = asyncio.get_running_loop()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.stop)
+
+    logger.info("Worker %s is consuming %s with concurrency %s", worker.consumer, worker.stream, worker.concurrency)
+
+    try:
+        await worker.run()
+    finally:
+        await session_manager.close_connection()
+
+
+def main() -> None:
+    logging.basicConfig(level=settings.log_level.upper(), format=LOG_FORMAT)
+    asyncio.run(serve(), loop_factory=uvloop.new_event_loop)
+
+
+if __name__ == "__main__":
+    main()
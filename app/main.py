@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
@@ -8,17 +9,25 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from fastapi_pagination import add_pagination
-from starlette.middleware.sessions import SessionMiddleware
 
 from app.database.engine import session_manager
 from app.exceptions.handlers import internal_error_exception_handler, validation_error_exception_handler
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.instrumentation import QueryStatsMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.replica import PrimaryPinMiddleware
+from app.middleware.session import RedisSessionMiddleware
 from app.routes.misc import router as router_misc
 from app.routes.user import router as router_user
 from app.settings import settings
+from app.utils.constants import LOG_FORMAT
+from app.utils.metrics import publish_periodically
+from app.utils.warmup import warmup
 
 logging.basicConfig(
     level=settings.log_level.upper(),
-    format="%(levelname)-9s %(asctime)-15s [%(name)s] %(filename)s/%(funcName)s: %(message)s",
+    format=LOG_FORMAT,
 )
 
 ROUTERS = (
@@ -28,8 +37,17 @@ ROUTERS = (
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI) -> AsyncIterator[None]:  # noqa: ARG001
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.ready = False
+    await warmup(app)
+    app.state.ready = True
+
+    publisher = asyncio.create_task(publish_periodically()) if settings.server_workers > 1 else None
     yield
+    app.state.ready = False
+
+    if publisher is not None:
+        publisher.cancel()
     await session_manager.close_connection()
 
 
@@ -88,6 +106,19 @@ def _openapi_schema() -> dict[str, Any]:
 
 app.openapi = _openapi_schema  # type: ignore[method-assign]
 
+# Innermost, so headers added per request by the middleware around it never end up in the cached OpenAPI response.
+app.add_middleware(
+    CompressionMiddleware, minimum_size=settings.compression_minimum_size, cached_paths={"/openapi.json"}
+)
+
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        RateLimitMiddleware,
+        default=settings.rate_limit_default,
+        rules=settings.rate_limit_rules,
+        fail_open=settings.rate_limit_fail_open,
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -98,4 +129,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(SessionMiddleware, secret_key=settings.secret_key)
+app.add_middleware(
+    RedisSessionMiddleware,
+    session_cookie=settings.session_cookie,
+    max_age=settings.session_max_age_seconds,
+    https_only=settings.session_https_only,
+)
+
+if session_manager.has_replicas:
+    app.add_middleware(PrimaryPinMiddleware, max_age=settings.db_replica_pin_seconds)
+
+if settings.sql_instrumentation:
+    app.add_middleware(QueryStatsMiddleware)
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
@@ -1,37 +1,138 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Sequence
+from contextlib import asynccontextmanager
 from typing import Any
 
 from fastapi import Response, status
+from fastapi_pagination.api import resolve_params
 from pydantic import BaseModel
+from sqlalchemy import UniqueConstraint, inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.base import ExecutableOption
 
 from app.database.base import Base
+from app.database.engine import session_manager
 from app.exceptions.http import HTTPBadRequestException, HTTPNotFoundException
 from app.repository.base import BaseRepository
-from app.utils.constants import DEFAULT_DESC, DEFAULT_ORDER_BY
+from app.schemas.base import BaseFilterSchema, BatchItemStatus, BatchUpdateItem, VersionRead
+from app.utils.constants import DEFAULT_DESC, DEFAULT_ORDER_BY, STREAM_BATCH_SIZE_DEFAULT, UNIT_OF_WORK_KEY
+from app.utils.filters import FILTER_OPERATORS, compile_filters
+from app.utils.metrics import metrics
 from app.utils.misc import camel_to_snake
-from app.utils.pagination import Page
+from app.utils.pagination import Page, TotalMode
+from app.utils.singleflight import SingleFlight
 
 
 class BaseManager[DBModelType: Base, SchemaCreateType: BaseModel, SchemaUpdateType: BaseModel]:
+    write_only_fields: frozenset[str] = frozenset()
+    sort_fields: frozenset[str] = frozenset({"id", "created_at", "updated_at"})
+    filter_schema: type[BaseFilterSchema] | None = None
+    # Columns of the unique index `upsert` resolves conflicts on.
+    conflict_fields: tuple[str, ...] = ()
+
     def __init__(
         self,
         db_model: type[DBModelType],
         repository: type[BaseRepository[DBModelType, SchemaCreateType, SchemaUpdateType]],
+        *,
+        coalesce_reads: bool = False,
     ) -> None:
         self.db_model = db_model
         self.repository = repository(self.db_model)
+        self.unique_fields = tuple(
+            column.key for column in inspect(self.db_model, raiseerr=True).columns if column.unique
+        )
+        self._projections: dict[type[BaseModel], tuple[str, ...]] = {}
+        self._validate_conflict_fields()
+        self.filter_spec = (
+            compile_filters(self.filter_schema, self.db_model, excluded=self.write_only_fields)
+            if self.filter_schema
+            else ()
+        )
+        self.coalesce_reads = coalesce_reads
+        self.single_flight = SingleFlight()
+
+        if coalesce_reads:
+            metrics.single_flights[self.db_model.__name__] = self.single_flight.stats
+
+    def _validate_conflict_fields(self) -> None:
+        if not self.conflict_fields:
+            return
+
+        # `ON CONFLICT` needs a unique index on exactly these columns to use as its arbiter.
+        table = inspect(self.db_model, raiseerr=True).local_table
+        unique_keys = [
+            {column.key for column in table.primary_key.columns},
+            *({column.key for column in index.columns} for index in table.indexes if index.unique),
+            *(
+                {column.key for column in constraint.columns}
+                for constraint in table.constraints
+                if isinstance(constraint, UniqueConstraint)
+            ),
+        ]
+
+        if set(self.conflict_fields) not in unique_keys:
+            raise ValueError(f"{type(self).__name__}.conflict_fields do not match a unique index of {table.name}")
+
+    def _conflict_key(self, obj: Any) -> tuple[Any, ...]:
+        return tuple(getattr(obj, field) for field in self.conflict_fields)
 
     def _get_order_by(self, order_by: str) -> Any:
         order_by = camel_to_snake(order_by)
 
+        # Only allow-listed fields are sortable, so every ordering has an index and `python -m app.database.audit` can
+        # check it.
+        if order_by not in self.sort_fields:
+            raise HTTPBadRequestException(detail="Invalid value for `orderBy`")
+
         if order_by in {"id", "created_at", "updated_at"}:
             return order_by
 
-        try:
-            return getattr(self.db_model, order_by)
-        except AttributeError as exc:
-            raise HTTPBadRequestException(detail="Invalid value for `orderBy`") from exc
+        return getattr(self.db_model, order_by)
+
+    def _get_columns(self, projection: type[BaseModel] | None) -> tuple[str, ...] | None:
+        if projection is None:
+            return None
+
+        if projection not in self._projections:
+            column_keys = inspect(self.db_model, raiseerr=True).columns.keys()
+            self._projections[projection] = tuple(
+                field
+                for field in projection.model_fields
+                if field in column_keys and field not in self.write_only_fields
+            )
+
+        return self._projections[projection]
+
+    def get_filters(self, query_filter: BaseFilterSchema | None) -> list[Any]:
+        if query_filter is None:
+            return []
+
+        if type(query_filter) is not self.filter_schema:
+            raise HTTPBadRequestException(detail="Invalid filter provided")
+
+        return [
+            FILTER_OPERATORS[operator](column, value)
+            for field, column, operator in self.filter_spec
+            if (value := getattr(query_filter, field)) is not None
+        ]
+
+    def _can_coalesce(self, session: AsyncSession, *criteria: Any) -> bool:
+        # Only keyword lookups on read-only sessions are coalesced: arbitrary filters and options have no stable key,
+        # and a read-write session must keep reading its own writes.
+        return self.coalesce_reads and not any(criteria) and getattr(session.sync_session, "read_only", False)
+
+    async def _coalesced[ResultType](
+        self, key: tuple[Hashable, ...], session: AsyncSession, read: Callable[[AsyncSession], Awaitable[ResultType]]
+    ) -> ResultType:
+        pinned = getattr(session.sync_session, "pinned", False)
+
+        async def shared_read() -> ResultType:
+            # The shared query outlives any single caller, so it runs on its own session instead of the caller's one.
+            async with session_manager.session(read_only=True, pinned=pinned) as shared_session:
+                return await read(shared_session)
+
+        return await self.single_flight.do((self.db_model.__name__, *key, pinned), shared_read)
 
     def _validate_kwargs(self, **kwargs: Any) -> None:
         if kwargs:
@@ -46,15 +147,33 @@ class BaseManager[DBModelType: Base, SchemaCreateType: BaseModel, SchemaUpdateTy
         options: list[ExecutableOption] | None = None,
         order_by: str = DEFAULT_ORDER_BY,
         desc: bool = DEFAULT_DESC,
+        projection: type[BaseModel] | None = None,
         session: AsyncSession,
         **kwargs: Any,
     ) -> DBModelType:
         order_by = self._get_order_by(order_by)
         self._validate_kwargs(**kwargs)
+        columns = self._get_columns(projection)
 
-        db_obj = await self.repository.fetch_one(
-            filters=filters, options=options, order_by=order_by, desc=desc, session=session, **kwargs
-        )
+        if self._can_coalesce(session, filters, options):
+            db_obj = await self._coalesced(
+                ("fetch_one", str(order_by), desc, columns, *sorted(kwargs.items())),
+                session,
+                lambda shared_session: self.repository.fetch_one(
+                    order_by=order_by, desc=desc, columns=columns, session=shared_session, **kwargs
+                ),
+            )
+
+        else:
+            db_obj = await self.repository.fetch_one(
+                filters=filters,
+                options=options,
+                order_by=order_by,
+                desc=desc,
+                columns=columns,
+                session=session,
+                **kwargs,
+            )
 
         if not db_obj:
             raise HTTPNotFoundException(model_name=self.db_model.__name__)
@@ -68,22 +187,194 @@ class BaseManager[DBModelType: Base, SchemaCreateType: BaseModel, SchemaUpdateTy
         options: list[ExecutableOption] | None = None,
         order_by: str = DEFAULT_ORDER_BY,
         desc: bool = DEFAULT_DESC,
+        projection: type[BaseModel] | None = None,
+        total_mode: TotalMode | None = None,
         session: AsyncSession,
         **kwargs: Any,
     ) -> Page[DBModelType]:
         order_by = self._get_order_by(order_by)
         self._validate_kwargs(**kwargs)
 
+        columns = self._get_columns(projection)
+
+        if self._can_coalesce(session, filters, options):
+            params: BaseModel = resolve_params()
+            return await self._coalesced(
+                (
+                    "fetch_paginated",
+                    str(order_by),
+                    desc,
+                    columns,
+                    total_mode,
+                    *sorted(params.model_dump().items()),
+                    *sorted(kwargs.items()),
+                ),
+                session,
+                lambda shared_session: self.repository.fetch_paginated(
+                    order_by=order_by,
+                    desc=desc,
+                    columns=columns,
+                    total_mode=total_mode,
+                    session=shared_session,
+                    **kwargs,
+                ),
+            )
+
         return await self.repository.fetch_paginated(
-            filters=filters, options=options, order_by=order_by, desc=desc, session=session, **kwargs
+            filters=filters,
+            options=options,
+            order_by=order_by,
+            desc=desc,
+            columns=columns,
+            total_mode=total_mode,
+            session=session,
+            **kwargs,
+        )
+
+    def stream(
+        self,
+        *,
+        filters: list[Any] | None = None,
+        options: list[ExecutableOption] | None = None,
+        order_by: str = DEFAULT_ORDER_BY,
+        desc: bool = DEFAULT_DESC,
+        batch_size: int = STREAM_BATCH_SIZE_DEFAULT,
+        projection: type[BaseModel] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Sequence[Any]]:
+        # Validate eagerly so that errors are raised before a streaming response starts.
+        order_by = self._get_order_by(order_by)
+        self._validate_kwargs(**kwargs)
+
+        return self._stream(
+            filters=filters,
+            options=options,
+            order_by=order_by,
+            desc=desc,
+            batch_size=batch_size,
+            columns=self._get_columns(projection),
+            **kwargs,
         )
 
+    async def _stream(self, **kwargs: Any) -> AsyncIterator[Sequence[Any]]:
+        async with session_manager.session(read_only=True) as session:
+            async for db_objs in self.repository.stream(session=session, **kwargs):
+                yield db_objs
+
+    def iter_batches(
+        self,
+        *,
+        filters: list[Any] | None = None,
+        options: list[ExecutableOption] | None = None,
+        order_by: str = DEFAULT_ORDER_BY,
+        batch_size: int = STREAM_BATCH_SIZE_DEFAULT,
+        projection: type[BaseModel] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Sequence[Any]]:
+        order_by = self._get_order_by(order_by)
+        self._validate_kwargs(**kwargs)
+
+        return self._iter_batches(
+            filters=filters,
+            options=options,
+            order_by=order_by,
+            limit=batch_size,
+            columns=self._get_columns(projection),
+            **kwargs,
+        )
+
+    async def _iter_batches(self, *, order_by: Any, limit: int, **kwargs: Any) -> AsyncIterator[Sequence[Any]]:
+        order_key = getattr(order_by, "key", order_by)
+        after = None
+
+        while True:
+            # A short-lived session per batch returns its connection to the pool and drops the identity map, so
+            # walking a large table holds at most one batch in memory.
+            async with session_manager.session(read_only=True) as session:
+                db_objs = await self.repository.fetch_batch(
+                    order_by=order_by, after=after, limit=limit, session=session, **kwargs
+                )
+
+            if not db_objs:
+                return
+
+            yield db_objs
+
+            if len(db_objs) < limit:
+                return
+
+            after = (getattr(db_objs[-1], order_key), db_objs[-1].id)
+
+    async def warmup(self, session: AsyncSession) -> None:
+        # Runs the single-object lookups with the arguments `fetch_one` uses, so the compiled statements and the
+        # connection's prepared statements are ready before the first request needs them.
+        order_by = self._get_order_by(DEFAULT_ORDER_BY)
+
+        for projection in (None, VersionRead):
+            columns = self._get_columns(projection)
+            await self.repository.fetch_one(
+                order_by=order_by, desc=DEFAULT_DESC, columns=columns, session=session, id=0
+            )
+
     async def exists(self, session: AsyncSession, *, filters: list[Any] | None = None, **kwargs: Any) -> bool:
         self._validate_kwargs(**kwargs)
         return await self.repository.exists(session, filters=filters, **kwargs)
 
+    @staticmethod
+    @asynccontextmanager
+    async def unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+        # Repository writes in the block only flush and the block commits once at the end; an exception leaves the
+        # rollback to the session context. A nested block joins the outer one.
+        if session.info.get(UNIT_OF_WORK_KEY):
+            yield session
+            return
+
+        session.info[UNIT_OF_WORK_KEY] = True
+        try:
+            yield session
+            await session.commit()
+        finally:
+            session.info.pop(UNIT_OF_WORK_KEY, None)
+
+    async def _prepare_create(  # noqa: PLR6301
+        self,
+        create_obj: SchemaCreateType,
+        *,
+        bulk: bool = False,  # noqa: ARG002
+    ) -> dict[str, Any]:
+        return create_obj.model_dump()
+
     async def create(self, create_obj: SchemaCreateType, session: AsyncSession) -> DBModelType:
-        return await self.repository.create(create_obj, session)
+        return await self.repository.create(await self._prepare_create(create_obj), session)
+
+    async def prepare_bulk(self, create_objs: Sequence[SchemaCreateType]) -> list[dict[str, Any]]:
+        return await asyncio.gather(*(self._prepare_create(create_obj, bulk=True) for create_obj in create_objs))
+
+    async def create_bulk(self, create_objs: Sequence[SchemaCreateType], session: AsyncSession) -> list[dict[str, Any]]:
+        return await self.insert_bulk(await self.prepare_bulk(create_objs), session)
+
+    async def insert_bulk(self, payload: Sequence[dict[str, Any]], session: AsyncSession) -> list[dict[str, Any]]:
+        db_objs = await self.repository.create_bulk(list(payload), session, ignore_conflicts=True)
+
+        if not self.unique_fields:
+            return [
+                {"index": index, "status": BatchItemStatus.CREATED, "data": db_obj}
+                for index, db_obj in enumerate(db_objs)
+            ]
+
+        created = {tuple(getattr(db_obj, field) for field in self.unique_fields): db_obj for db_obj in db_objs}
+        conflict_detail = f"{self.db_model.__name__} with this {', '.join(self.unique_fields)} already exists"
+        results = []
+
+        for index, row in enumerate(payload):
+            db_obj = created.pop(tuple(row.get(field) for field in self.unique_fields), None)
+            results.append(
+                {"index": index, "status": BatchItemStatus.CREATED, "data": db_obj}
+                if db_obj
+                else {"index": index, "status": BatchItemStatus.CONFLICT, "detail": conflict_detail}
+            )
+
+        return results
 
     async def update(self, db_obj_id: int, update_obj: SchemaUpdateType, session: AsyncSession) -> DBModelType:
         db_obj = await self.fetch_one(id=db_obj_id, session=session)
@@ -95,6 +386,54 @@ class BaseManager[DBModelType: Base, SchemaCreateType: BaseModel, SchemaUpdateTy
         self._validate_kwargs(**kwargs)
         return await self.repository.update_bulk(session=session, payload=payload, filters=filters, **kwargs)
 
+    async def update_rows(
+        self, update_objs: Sequence[BatchUpdateItem[SchemaUpdateType]], session: AsyncSession
+    ) -> list[dict[str, Any]]:
+        payload = [
+            {**update_obj.changes.model_dump(exclude_unset=True), "id": update_obj.id} for update_obj in update_objs
+        ]
+        db_objs = await self.repository.update_rows(payload, session)
+        updated = {db_obj.id: db_obj for db_obj in db_objs}  # type: ignore[attr-defined]
+        not_found_detail = f"{self.db_model.__name__} not found"
+
+        return [
+            {"index": index, "status": BatchItemStatus.UPDATED, "data": updated[update_obj.id]}
+            if update_obj.id in updated
+            else {"index": index, "status": BatchItemStatus.NOT_FOUND, "detail": not_found_detail}
+            for index, update_obj in enumerate(update_objs)
+        ]
+
+    async def upsert(
+        self, create_objs: Sequence[SchemaCreateType], session: AsyncSession, *, overwrite_write_only: bool = False
+    ) -> Sequence[DBModelType]:
+        if not self.conflict_fields:
+            raise ValueError(f"{type(self).__name__}.conflict_fields must be set to upsert")
+
+        # A statement may touch each conflicting row only once, so the last occurrence of every key wins.
+        rows = {self._conflict_key(create_obj): create_obj for create_obj in create_objs}
+
+        if overwrite_write_only or not self.write_only_fields:
+            payload = await self.prepare_bulk(list(rows.values()))
+            return await self.repository.upsert(payload, session, index_elements=self.conflict_fields)
+
+        # Existing rows keep their write-only fields, such as password, so they are updated without them and only the
+        # rows that are still missing afterwards have those fields prepared and inserted.
+        updated = await self.repository.update_rows(
+            [create_obj.model_dump(exclude={*self.write_only_fields, "created_at"}) for create_obj in rows.values()],
+            session,
+            key=self.conflict_fields,
+            is_flush=True,
+        )
+        db_objs = {self._conflict_key(db_obj): db_obj for db_obj in updated}
+        payload = await self.prepare_bulk([create_obj for key, create_obj in rows.items() if key not in db_objs])
+        # Rows created concurrently since the update still conflict here and keep their write-only fields.
+        inserted = await self.repository.upsert(
+            payload, session, index_elements=self.conflict_fields, preserve_fields=self.write_only_fields
+        )
+        db_objs |= {self._conflict_key(db_obj): db_obj for db_obj in inserted}
+
+        return [db_objs[key] for key in rows]
+
     async def delete(self, db_obj_id: int, session: AsyncSession) -> Response:
         db_obj = await self.repository.fetch_one(id=db_obj_id, session=session)
 
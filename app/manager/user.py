@@ -1,11 +1,42 @@
+import time
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.database.models import User
 from app.manager.base import BaseManager
 from app.repository.user import UserRepository
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserFilter, UserRead, UserUpdate
+from app.settings import settings
+from app.utils.cache import ExpiringLRUCache
+from app.utils.constants import AUTH_CACHE_SIZE
+from app.utils.secrets import async_hash_secret
 
 
 class UserManager(BaseManager[User, UserCreate, UserUpdate]):
-    pass
+    write_only_fields = frozenset({"password"})
+    sort_fields = BaseManager.sort_fields | {"email"}
+    filter_schema = UserFilter
+    conflict_fields = ("email",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.authenticated_cache: ExpiringLRUCache[int, UserRead] = ExpiringLRUCache(AUTH_CACHE_SIZE)
+
+    async def _prepare_create(self, create_obj: UserCreate, *, bulk: bool = False) -> dict[str, Any]:  # noqa: PLR6301
+        payload = create_obj.model_dump()
+        payload["password"] = await async_hash_secret(create_obj.password, bulk=bulk)
+        return payload
+
+    async def fetch_authenticated(self, user_id: int, session: AsyncSession) -> UserRead:
+        # Read models are reused for a few seconds, so profile changes show up on /me with that much delay.
+        # Only the projected columns are cached, which keeps password hashes out of process memory.
+        if (user := self.authenticated_cache.get(user_id)) is None:
+            db_obj = await self.fetch_one(id=user_id, projection=UserRead, session=session)
+            user = UserRead.model_validate(db_obj)
+            self.authenticated_cache.set(user_id, user, time.time() + settings.auth_user_cache_seconds)
+
+        return user
 
 
-user_manager = UserManager(User, UserRepository)
+user_manager = UserManager(User, UserRepository, coalesce_reads=True)
@@ -0,0 +1,157 @@
+import contextlib
+import zlib
+from collections.abc import Callable, Collection
+from typing import Protocol
+
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+BROTLI_QUALITY = 4
+CACHED_HEADERS = frozenset({b"content-type", b"content-length", b"content-encoding", b"vary"})
+
+
+class Encoder(Protocol):
+    def compress(self, data: bytes, *, final: bool) -> bytes: ...
+
+
+class ZstdEncoder:
+    def __init__(self) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes, *, final: bool) -> bytes:
+        flush_mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._compressor.compress(data) + self._compressor.flush(flush_mode)
+
+
+class BrotliEncoder:
+    def __init__(self) -> None:
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes, *, final: bool) -> bytes:
+        return self._compressor.process(data) + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class GzipEncoder:
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, *, final: bool) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+# Ordered by server preference.
+ENCODERS: dict[str, Callable[[], Encoder]] = {"zstd": ZstdEncoder, "br": BrotliEncoder, "gzip": GzipEncoder}
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    weights: dict[str, float] = {}
+
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        weight = 1.0
+
+        with contextlib.suppress(ValueError):
+            if (param := params.strip()).startswith("q="):
+                weight = float(param[2:])
+
+        weights[coding.strip().lower()] = weight
+
+    best_encoding, best_weight = None, 0.0
+
+    for encoding in ENCODERS:
+        if (weight := weights.get(encoding, weights.get("*", 0.0))) > best_weight:
+            best_encoding, best_weight = encoding, weight
+
+    return best_encoding
+
+
+class CompressionResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.encoder: Encoder | None = None
+        self.start_message: Message | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether the response is worth compressing.
+            self.start_message = message
+            return
+
+        if self.start_message is not None:
+            if message["type"] == "http.response.body":
+                self._start_encoding(MutableHeaders(scope=self.start_message), message)
+
+            await self.send(self.start_message)
+            self.start_message = None
+
+        if message["type"] == "http.response.body" and self.encoder is not None:
+            # Every chunk is flushed so that streamed responses reach the client without extra buffering.
+            final = not message.get("more_body", False)
+            message = {**message, "body": self.encoder.compress(message.get("body", b""), final=final)}
+
+        await self.send(message)
+
+    def _start_encoding(self, headers: MutableHeaders, message: Message) -> None:
+        body, more_body = message.get("body", b""), message.get("more_body", False)
+
+        if "content-encoding" in headers or (not more_body and len(body) < self.minimum_size):
+            return
+
+        self.encoder = ENCODERS[self.encoding]()
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        del headers["Content-Length"]
+
+        if not more_body:
+            message["body"] = self.encoder.compress(body, final=True)
+            headers["Content-Length"] = str(len(message["body"]))
+            self.encoder = None
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, *, minimum_size: int = 1024, cached_paths: Collection[str] = ()) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cached_paths = cached_paths
+        self._cache: dict[tuple[str, str], tuple[list[tuple[bytes, bytes]], bytes]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if (encoding := negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))) is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] != "GET" or scope["path"] not in self.cached_paths:
+            await self.app(scope, receive, CompressionResponder(send, encoding, self.minimum_size))
+            return
+
+        # Documents such as the OpenAPI schema never change at runtime, so they are compressed once per encoding.
+        # Only the body and its content headers are kept; the start message is rebuilt for every request.
+        if (cached := self._cache.get((scope["path"], encoding))) is None:
+            messages: list[Message] = []
+
+            async def collect(message: Message) -> None:  # noqa: RUF029
+                messages.append(message)
+
+            await self.app(scope, receive, CompressionResponder(collect, encoding, self.minimum_size))
+
+            if len(messages) != 2 or messages[0]["status"] != 200:  # noqa: PLR2004
+                for message in messages:
+                    await send(message)
+                return
+
+            headers = [(name, value) for name, value in messages[0]["headers"] if name in CACHED_HEADERS]
+            cached = self._cache[scope["path"], encoding] = (headers, messages[1]["body"])
+
+        headers, body = cached
+        await send({"type": "http.response.start", "status": 200, "headers": list(headers)})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,63 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database.instrumentation import QueryStats, query_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        started_at = time.perf_counter()
+        status_code = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats.reset(token)
+
+            if stats.statements:
+                logger.info(
+                    "method=%s path=%s status=%s statements=%d cache_hits=%d rows=%d db_ms=%.2f pool_wait_ms=%.2f "
+                    "total_ms=%.2f",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    stats.statements,
+                    stats.cache_hits,
+                    stats.rows,
+                    stats.db_time * 1000,
+                    stats.pool_wait * 1000,
+                    (time.perf_counter() - started_at) * 1000,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status_code": status_code,
+                        "statements": stats.statements,
+                        "cache_hits": stats.cache_hits,
+                        "rows": stats.rows,
+                        "db_time": stats.db_time,
+                        "pool_wait": stats.pool_wait,
+                    },
+                )
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass
+from functools import cache
+from itertools import starmap
+from typing import TYPE_CHECKING
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.utils.cache import ExpiringLRUCache, async_redis
+from app.utils.constants import (
+    RATE_LIMIT_DENIED_CACHE_SIZE,
+    RATE_LIMIT_KEY_PREFIX,
+    RATE_LIMIT_PERIODS,
+    RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+)
+from app.utils.tokens import claims_cache, decode_jwt
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+logger = logging.getLogger(__name__)
+
+# Generic cell rate algorithm: one key per client holds the theoretical arrival time of its next request, so a check
+# is a single atomic GET/SET. Redis TIME keeps replicas on the same clock.
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local interval = period / limit
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tat = math.max(tonumber(redis.call("GET", KEYS[1])) or now, now)
+local allow_at = tat + interval - period
+
+if allow_at > now then
+    return {0, tostring(allow_at - now)}
+end
+
+redis.call("SET", KEYS[1], tostring(tat + interval), "PX", math.ceil((tat + interval - now) * 1000))
+return {1, "0"}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    limit: int
+    period: int
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit | None":
+        if value == "unlimited":
+            return None
+
+        limit, period = value.split("/")
+        return cls(int(limit), RATE_LIMIT_PERIODS[period])
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitRule:
+    name: str
+    method: str
+    path: re.Pattern[str]
+    rate: RateLimit | None
+
+    @classmethod
+    def parse(cls, route: str, value: str) -> "RateLimitRule":
+        method, path = route.split(" ", 1)
+        return cls(route, method.upper(), compile_path(path)[0], RateLimit.parse(value))
+
+    def matches(self, scope: Scope) -> bool:
+        return self.method == scope["method"] and self.path.match(scope["path"]) is not None
+
+
+@cache
+def gcra_script() -> "AsyncScript":
+    return async_redis().register_script(GCRA_SCRIPT)
+
+
+def client_key(scope: Scope) -> str:
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+
+    if scheme.lower() == "bearer" and token:
+        claims = claims_cache().get(token) or decode_jwt(token)
+        if claims is not None and "sub" in claims:
+            return f"sub:{claims['sub']}"
+
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, *, default: str, rules: dict[str, str], fail_open: bool = True) -> None:
+        self.app = app
+        self.default = RateLimit.parse(default)
+        self.rules = list(starmap(RateLimitRule.parse, rules.items()))
+        self.fail_open = fail_open
+        self._denied: ExpiringLRUCache[str, float] = ExpiringLRUCache(RATE_LIMIT_DENIED_CACHE_SIZE)
+
+    def _match(self, scope: Scope) -> tuple[str, RateLimit | None]:
+        for rule in self.rules:
+            if rule.matches(scope):
+                return rule.name, rule.rate
+
+        return "default", self.default
+
+    async def _acquire(self, key: str, rate: RateLimit) -> float | None:
+        # A client that was just rejected is rejected locally until it may retry, which keeps a flood off Redis.
+        if (retry_at := self._denied.get(key)) is not None:
+            return retry_at - time.time()
+
+        async with asyncio.timeout(RATE_LIMIT_REDIS_TIMEOUT_SECONDS):
+            allowed, retry_after = await gcra_script()(keys=[key], args=[rate.limit, rate.period])
+
+        if allowed:
+            return None
+
+        retry_at = time.time() + float(retry_after)
+        self._denied.set(key, retry_at, retry_at)
+        return float(retry_after)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        name, rate = self._match(scope)
+
+        if rate is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            retry_after = await self._acquire(f"{RATE_LIMIT_KEY_PREFIX}:{name}:{client_key(scope)}", rate)
+        except Exception as exc:
+            logger.warning(
+                "Rate limiter unavailable (%r), %s request", exc, "allowing" if self.fail_open else "rejecting"
+            )
+
+            if not self.fail_open:
+                response = JSONResponse(status_code=503, content={"detail": "Service Unavailable"})
+                await response(scope, receive, send)
+                return
+
+            retry_after = None
+
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            status_code=429,
+            content={"detail": "Too many requests"},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
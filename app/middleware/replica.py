@@ -0,0 +1,30 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database.engine import PRIMARY_PIN_COOKIE, PrimaryPin, primary_pin
+
+
+class PrimaryPinMiddleware:
+    def __init__(self, app: ASGIApp, *, max_age: int) -> None:
+        self.app = app
+        self.cookie = f"{PRIMARY_PIN_COOKIE}=1; max-age={max_age}; path=/; httponly; samesite=lax"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Set by a commit that wrote to the primary, so the client's next reads skip the replicas until they catch up.
+        pin = PrimaryPin()
+        token = primary_pin.set(pin)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and pin.requested:
+                MutableHeaders(scope=message).append("Set-Cookie", self.cookie)
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            primary_pin.reset(token)
@@ -0,0 +1,106 @@
+import json
+import secrets
+from collections.abc import Iterator, MutableMapping
+from typing import Any, Literal, Self
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.exceptions.session import SessionNotLoadedError
+from app.utils.cache import async_redis
+from app.utils.constants import SESSION_KEY_PREFIX
+
+
+class RedisSession(MutableMapping[str, Any]):
+    def __init__(self, session_id: str | None) -> None:
+        self.session_id = session_id
+        self.modified = False
+        self._data: dict[str, Any] | None = None if session_id else {}
+
+    @property
+    def key(self) -> str:
+        return f"{SESSION_KEY_PREFIX}:{self.session_id}"
+
+    @property
+    def data(self) -> dict[str, Any]:
+        if self._data is None:
+            raise SessionNotLoadedError
+        return self._data
+
+    async def load(self) -> Self:
+        if self._data is None:
+            payload = await async_redis().get(self.key)
+            self._data = json.loads(payload) if payload else {}
+
+            # An id without a stored session is never reused, so a client cannot fix the id a session is saved under.
+            if not payload:
+                self.session_id = None
+        return self
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.data[key] = value
+        self.modified = True
+
+    def __delitem__(self, key: str) -> None:
+        del self.data[key]
+        self.modified = True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class RedisSessionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        session_cookie: str = "session",
+        max_age: int,
+        same_site: Literal["lax", "strict", "none"] = "lax",
+        https_only: bool = False,
+    ) -> None:
+        self.app = app
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.cookie_flags = f"path=/; httponly; samesite={same_site}" + ("; secure" if https_only else "")
+
+    async def _save(self, session: RedisSession) -> str | None:
+        redis = async_redis()
+
+        if not session:
+            if session.session_id is not None:
+                await redis.delete(session.key)
+                return f"{self.session_cookie}=null; expires=Thu, 01 Jan 1970 00:00:00 GMT; {self.cookie_flags}"
+            return None
+
+        session.session_id = session.session_id or secrets.token_urlsafe(32)
+        await redis.set(session.key, json.dumps(session.data), ex=self.max_age)
+        return f"{self.session_cookie}={session.session_id}; max-age={self.max_age}; {self.cookie_flags}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in {"http", "websocket"}:
+            await self.app(scope, receive, send)
+            return
+
+        # Only the cookie is parsed up front; Redis is read when a route loads the session and written when it changed.
+        session = RedisSession(HTTPConnection(scope).cookies.get(self.session_cookie))
+        scope["session"] = session
+
+        async def send_wrapper(message: Message) -> None:
+            if (
+                message["type"] == "http.response.start"
+                and session.modified
+                and (cookie := await self._save(session)) is not None
+            ):
+                MutableHeaders(scope=message).append("Set-Cookie", cookie)
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
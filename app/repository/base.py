@@ -1,20 +1,95 @@
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Callable, Collection, Hashable, Sequence
+from itertools import batched
 from typing import Any
 
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.api import resolve_params
+from fastapi_pagination.ext.sqlalchemy import apaginate
 from pydantic import BaseModel
-from sqlalchemy import delete, desc as sa_desc, exists as sa_exists, insert, select, update
+from sqlalchemy import (
+    Select,
+    bindparam,
+    column,
+    delete,
+    desc as sa_desc,
+    exists as sa_exists,
+    inspect,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql.base import ExecutableOption
+from sqlalchemy.orm.attributes import instance_dict
+from sqlalchemy.sql.base import Executable, ExecutableOption
 
 from app.database.base import Base
-from app.utils.constants import DEFAULT_DESC, DEFAULT_ORDER_BY
-from app.utils.pagination import Page
+from app.settings import settings
+from app.utils.constants import (
+    DEFAULT_DESC,
+    DEFAULT_ORDER_BY,
+    POSTGRES_MAX_BIND_PARAMS,
+    STREAM_BATCH_SIZE_DEFAULT,
+    UNIT_OF_WORK_KEY,
+)
+from app.utils.pagination import Page, TotalMode, count_total
 
 
 class BaseRepository[DBModelType: Base, SchemaCreateType: BaseModel, SchemaUpdateType: BaseModel]:
     def __init__(self, db_model: type[DBModelType]) -> None:
         self.db_model = db_model
+        self._statements: dict[Hashable, Any] = {}
+
+    def _column(self, column: Any) -> Any:
+        return getattr(self.db_model, column) if isinstance(column, str) else column
+
+    def _select(self, columns: Sequence[str] | None = None) -> Select[Any]:
+        # Selecting plain columns returns lightweight rows and skips ORM hydration and identity-map bookkeeping.
+        return select(*(getattr(self.db_model, column) for column in columns)) if columns else select(self.db_model)
+
+    def _statement[StatementType: Executable](self, key: Hashable, build: Callable[[], StatementType]) -> StatementType:
+        # One statement object per filter shape keeps its memoized cache key, so repeated lookups skip both expression
+        # construction and compilation; values are passed as bind parameters at execution time.
+        if (statement := self._statements.get(key)) is None:
+            statement = self._statements[key] = build()
+
+        return statement
+
+    def _where(self, keys: Sequence[str]) -> list[Any]:
+        return [getattr(self.db_model, key) == bindparam(f"filter_{key}") for key in keys]
+
+    @staticmethod
+    def _is_bindable(kwargs: dict[str, Any]) -> bool:
+        # `column == None` has to compile to `IS NULL`, which a prebuilt `column = :value` statement cannot express.
+        return all(value is not None for value in kwargs.values())
+
+    def _expire_matching(self, session: AsyncSession, kwargs: dict[str, Any], attribute_names: Sequence[str]) -> None:
+        for db_obj in list(session.identity_map.values()):
+            if not isinstance(db_obj, self.db_model):
+                continue
+
+            # Only loaded values are compared, so an object whose filter columns are unloaded is expired to be safe.
+            loaded = instance_dict(db_obj)
+            if all(loaded.get(key, value) == value for key, value in kwargs.items()):
+                session.expire(db_obj, list(attribute_names))
+
+    @staticmethod
+    def _params(kwargs: dict[str, Any], prefix: str = "filter") -> dict[str, Any]:
+        return {f"{prefix}_{key}": value for key, value in kwargs.items()}
+
+    @staticmethod
+    def _chunk_size(payload: list[dict[str, Any]]) -> int:
+        columns_count = max((len(row) for row in payload), default=1)
+        return max(POSTGRES_MAX_BIND_PARAMS // columns_count, 1)
+
+    @staticmethod
+    async def _complete(session: AsyncSession, *, is_flush: bool) -> None:
+        # Inside a unit of work the commit is left to the end of the block, so the write is only flushed.
+        if is_flush or session.info.get(UNIT_OF_WORK_KEY):
+            await session.flush()
+
+        else:
+            await session.commit()
 
     async def fetch_one(
         self,
@@ -23,20 +98,37 @@ class BaseRepository[DBModelType: Base, SchemaCreateType: BaseModel, SchemaUpdat
         options: list[ExecutableOption] | None = None,
         order_by: Any = DEFAULT_ORDER_BY,
         desc: bool = DEFAULT_DESC,
+        columns: Sequence[str] | None = None,
         session: AsyncSession,
         **kwargs: Any,
     ) -> DBModelType | None:
-        filters = filters or []
+        if order_by is not None and columns:
+            order_by = self._column(order_by)
 
-        query = select(self.db_model).filter(*filters).filter_by(**kwargs)
+        if not filters and not options and self._is_bindable(kwargs):
+            keys = tuple(sorted(kwargs))
 
-        if order_by is not None:
-            query = query.order_by(sa_desc(order_by) if desc else order_by)
+            def build() -> Select[Any]:
+                query = self._select(columns).where(*self._where(keys))
+                return query.order_by(sa_desc(order_by) if desc else order_by) if order_by is not None else query
 
-        if options:
-            query = query.options(*options)
+            query = self._statement(("fetch_one", keys, str(order_by), desc, tuple(columns or ())), build)
+            result = await session.execute(query, self._params(kwargs))
+
+        else:
+            query = self._select(columns).filter(*(filters or [])).filter_by(**kwargs)
+
+            if order_by is not None:
+                query = query.order_by(sa_desc(order_by) if desc else order_by)
+
+            if options and not columns:
+                query = query.options(*options)
+
+            result = await session.execute(query)
 
-        return (await session.execute(query)).scalars().first()
+        # Projected lookups return plain rows with the requested columns instead of model instances.
+        db_obj: Any = result.first() if columns else result.scalars().first()
+        return db_obj
 
     async def fetch_paginated(
         self,
@@ -45,20 +137,31 @@ class BaseRepository[DBModelType: Base, SchemaCreateType: BaseModel, SchemaUpdat
         options: list[ExecutableOption] | None = None,
         order_by: Any = DEFAULT_ORDER_BY,
         desc: bool = DEFAULT_DESC,
+        columns: Sequence[str] | None = None,
+        total_mode: TotalMode | None = None,
         session: AsyncSession,
         **kwargs: Any,
     ) -> Page[DBModelType]:
         filters = filters or []
 
-        query = select(self.db_model).filter(*filters).filter_by(**kwargs)
+        query = self._select(columns).filter(*filters).filter_by(**kwargs)
 
         if order_by is not None:
-            query = query.order_by(sa_desc(order_by) if desc else order_by)
+            # The cursor is keyset-based, so the primary key breaks ties between rows sharing the ordering value.
+            keys = dict.fromkeys((self._column(order_by), self._column("id")))
+            query = query.order_by(*(sa_desc(key) if desc else key for key in keys))
 
-        if options:
+        if options and not columns:
             query = query.options(*options)
 
-        return await paginate(session, query)
+        page = await apaginate(session, query)
+        page.total, page.total_mode = await count_total(
+            session,
+            query,
+            total_mode or getattr(resolve_params(), "total_mode", None) or TotalMode(settings.pagination_total_mode),
+        )
+
+        return page
 
     async def fetch_bulk(
         self,
@@ -82,14 +185,78 @@ class BaseRepository[DBModelType: Base, SchemaCreateType: BaseModel, SchemaUpdat
             query = query.options(*options)
 
         if limit is not None:
-            query.limit(limit)
+            query = query.limit(limit)
 
         return (await session.execute(query)).scalars().all()
 
-    async def exists(self, session: AsyncSession, *, filters: list[Any] | None = None, **kwargs: Any) -> bool:
+    async def fetch_batch(
+        self,
+        *,
+        filters: list[Any] | None = None,
+        options: list[ExecutableOption] | None = None,
+        order_by: Any = DEFAULT_ORDER_BY,
+        after: tuple[Any, Any] | None = None,
+        limit: int = STREAM_BATCH_SIZE_DEFAULT,
+        columns: Sequence[str] | None = None,
+        session: AsyncSession,
+        **kwargs: Any,
+    ) -> Sequence[Any]:
+        # Keyset pagination on `(order_by, id)`: the primary key breaks ties so that no row is skipped or repeated
+        # when the ordering column is not unique.
+        keys = (self._column(order_by), self._column("id"))
+
+        if columns:
+            columns = (*columns, *(key.key for key in keys if key.key not in columns))
+
+        query = self._select(columns).filter(*(filters or [])).filter_by(**kwargs)
+
+        if after is not None:
+            query = query.where(tuple_(*keys) > tuple_(*after))
+
+        query = query.order_by(*keys).limit(limit)
+
+        if options and not columns:
+            query = query.options(*options)
+
+        result = await session.execute(query)
+        return result.all() if columns else result.scalars().all()
+
+    async def stream(
+        self,
+        *,
+        filters: list[Any] | None = None,
+        options: list[ExecutableOption] | None = None,
+        order_by: Any = DEFAULT_ORDER_BY,
+        desc: bool = DEFAULT_DESC,
+        batch_size: int = STREAM_BATCH_SIZE_DEFAULT,
+        columns: Sequence[str] | None = None,
+        session: AsyncSession,
+        **kwargs: Any,
+    ) -> AsyncIterator[Sequence[Any]]:
         filters = filters or []
-        filters_by = [getattr(self.db_model, key) == value for key, value in kwargs.items()] if kwargs else []
-        return bool((await session.execute(select(sa_exists().where(*filters, *filters_by)))).scalar())
+
+        query = self._select(columns).filter(*filters).filter_by(**kwargs)
+
+        if order_by is not None:
+            order_by = self._column(order_by) if columns else order_by
+            query = query.order_by(sa_desc(order_by) if desc else order_by)
+
+        if options and not columns:
+            query = query.options(*options)
+
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+
+        async for db_objs in result.partitions() if columns else result.scalars().partitions():
+            yield db_objs
+
+    async def exists(self, session: AsyncSession, *, filters: list[Any] | None = None, **kwargs: Any) -> bool:
+        if not filters and self._is_bindable(kwargs):
+            keys = tuple(sorted(kwargs))
+            query = self._statement(("exists", keys), lambda: select(sa_exists().where(*self._where(keys))))
+            return bool((await session.execute(query, self._params(kwargs))).scalar())
+
+        filters_by = [getattr(self.db_model, key) == value for key, value in kwargs.items()]
+        return bool((await session.execute(select(sa_exists().where(*(filters or []), *filters_by)))).scalar())
 
     async def create(
         self, create_obj: SchemaCreateType | dict[str, Any], session: AsyncSession, *, is_flush: bool = False
@@ -100,28 +267,63 @@ class BaseRepository[DBModelType: Base, SchemaCreateType: BaseModel, SchemaUpdat
 
         session.add(db_obj)
 
-        if is_flush:
-            await session.flush()
-
-        else:
-            await session.commit()
-            await session.refresh(db_obj)
+        await self._complete(session, is_flush=is_flush)
 
         return db_obj
 
     async def create_bulk(
-        self, payload: list[dict[str, Any]], session: AsyncSession, *, is_flush: bool = False
-    ) -> None:
-        await session.execute(insert(self.db_model).values(payload))
+        self,
+        payload: list[dict[str, Any]],
+        session: AsyncSession,
+        *,
+        ignore_conflicts: bool = False,
+        is_flush: bool = False,
+    ) -> Sequence[DBModelType]:
+        db_objs: list[DBModelType] = []
 
-        if is_flush:
-            await session.flush()
+        for chunk in batched(payload, self._chunk_size(payload), strict=False):
+            query = insert(self.db_model).values(list(chunk))
 
-        else:
-            await session.commit()
+            if ignore_conflicts:
+                query = query.on_conflict_do_nothing()
+
+            db_objs.extend((await session.execute(query.returning(self.db_model))).scalars().all())
+
+        await self._complete(session, is_flush=is_flush)
+
+        return db_objs
+
+    async def upsert(
+        self,
+        payload: list[dict[str, Any]],
+        session: AsyncSession,
+        *,
+        index_elements: Sequence[str],
+        preserve_fields: Collection[str] = (),
+        is_flush: bool = False,
+    ) -> Sequence[DBModelType]:
+        # A statement may touch each conflicting row only once, so the last occurrence of every key wins.
+        rows = list({tuple(row[key] for key in index_elements): row for row in payload}.values())
+        db_objs: list[DBModelType] = []
+
+        for chunk in batched(rows, self._chunk_size(rows), strict=False):
+            query = insert(self.db_model).values(list(chunk))
+            set_ = {
+                key: query.excluded[key]
+                for key in chunk[0]
+                if key not in index_elements and key not in {"id", "created_at", *preserve_fields}
+            }
+            query = query.on_conflict_do_update(index_elements=index_elements, set_=set_)
+
+            result = await session.execute(query.returning(self.db_model).execution_options(populate_existing=True))
+            db_objs.extend(result.scalars().all())
+
+        await self._complete(session, is_flush=is_flush)
+
+        return db_objs
 
-    @staticmethod
     async def update(
+        self,
         db_obj: DBModelType,
         update_obj: SchemaUpdateType | dict[str, Any],
         session: AsyncSession,
@@ -134,12 +336,7 @@ class BaseRepository[DBModelType: Base, SchemaCreateType: BaseModel, SchemaUpdat
 
         session.add(db_obj)
 
-        if is_flush:
-            await session.flush()
-
-        else:
-            await session.commit()
-            await session.refresh(db_obj)
+        await self._complete(session, is_flush=is_flush)
 
         return db_obj
 
@@ -152,35 +349,78 @@ class BaseRepository[DBModelType: Base, SchemaCreateType: BaseModel, SchemaUpdat
         is_flush: bool = False,
         **kwargs: Any,
     ) -> None:
-        filters = filters or []
-
-        await session.execute(update(self.db_model).filter(*filters).filter_by(**kwargs).values(payload))
-
-        if is_flush:
-            await session.flush()
+        if not filters and self._is_bindable(kwargs):
+            keys, values = tuple(sorted(kwargs)), tuple(sorted(payload))
+            # Bind parameters cannot be evaluated in Python to synchronize the session, so matching objects already
+            # loaded in it are expired instead and reload the changed columns on their next refresh.
+            query = self._statement(
+                ("update_bulk", keys, values),
+                lambda: update(self.db_model)
+                .where(*self._where(keys))
+                .values({key: bindparam(f"value_{key}") for key in values})
+                .execution_options(synchronize_session=False),
+            )
+            await session.execute(query, self._params(kwargs) | self._params(payload, "value"))
+            self._expire_matching(session, kwargs, values)
 
         else:
-            await session.commit()
+            await session.execute(update(self.db_model).filter(*(filters or [])).filter_by(**kwargs).values(payload))
 
-    @staticmethod
-    async def delete(db_obj: DBModelType, session: AsyncSession, *, is_flush: bool = False) -> None:
-        if is_flush:
-            await session.delete(db_obj)
-            await session.flush()
+        await self._complete(session, is_flush=is_flush)
 
-        else:
-            await session.delete(db_obj)
-            await session.commit()
+    async def update_rows(
+        self,
+        payload: list[dict[str, Any]],
+        session: AsyncSession,
+        *,
+        key: str | Sequence[str] = "id",
+        is_flush: bool = False,
+    ) -> Sequence[DBModelType]:
+        # Rows are grouped by the set of columns they change, and each group runs as a single
+        # `UPDATE ... FROM (VALUES ...)` statement instead of one round trip per row.
+        key_fields = (key,) if isinstance(key, str) else tuple(key)
+        groups: dict[tuple[str, ...], dict[Any, dict[str, Any]]] = {}
+
+        for row in payload:
+            groups.setdefault(tuple(sorted(row)), {})[tuple(row[name] for name in key_fields)] = row
+
+        model_columns = inspect(self.db_model, raiseerr=True).columns
+        db_objs: list[DBModelType] = []
+
+        for keys, rows in groups.items():
+            for chunk in batched(rows.values(), self._chunk_size(list(rows.values())), strict=False):
+                data = values(*(column(name, model_columns[name].type) for name in keys), name="data").data([
+                    tuple(row[name] for name in keys) for row in chunk
+                ])
+                query = (
+                    update(self.db_model)
+                    .where(*(getattr(self.db_model, name) == data.c[name] for name in key_fields))
+                    .values({name: data.c[name] for name in keys if name not in key_fields})
+                    .returning(self.db_model)
+                    .execution_options(synchronize_session=False, populate_existing=True)
+                )
+                db_objs.extend((await session.execute(query)).scalars().all())
+
+        await self._complete(session, is_flush=is_flush)
+
+        return db_objs
+
+    async def delete(self, db_obj: DBModelType, session: AsyncSession, *, is_flush: bool = False) -> None:
+        await session.delete(db_obj)
+        await self._complete(session, is_flush=is_flush)
 
     async def delete_bulk(
         self, *, filters: list[Any] | None = None, session: AsyncSession, is_flush: bool = False, **kwargs: Any
     ) -> None:
-        filters = filters or []
-
-        await session.execute(delete(self.db_model).filter(*filters).filter_by(**kwargs))
-
-        if is_flush:
-            await session.flush()
+        if not filters and self._is_bindable(kwargs):
+            keys = tuple(sorted(kwargs))
+            query = self._statement(
+                ("delete_bulk", keys),
+                lambda: delete(self.db_model).where(*self._where(keys)).execution_options(synchronize_session="fetch"),
+            )
+            await session.execute(query, self._params(kwargs))
 
         else:
-            await session.commit()
+            await session.execute(delete(self.db_model).filter(*(filters or [])).filter_by(**kwargs))
+
+        await self._complete(session, is_flush=is_flush)
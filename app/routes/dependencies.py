@@ -1,8 +1,41 @@
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.engine import session_manager
+from app.exceptions.http import HTTPNotFoundException, HTTPUnauthorizedException
+from app.manager.user import user_manager
+from app.middleware.session import RedisSession
+from app.schemas.user import UserRead
+from app.utils.tokens import verify_jwt
 
 DatabaseSessionDependency = Annotated[AsyncSession, Depends(session_manager.get_session)]
+ReadOnlyDatabaseSessionDependency = Annotated[AsyncSession, Depends(session_manager.get_read_session)]
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_current_user(
+    session: ReadOnlyDatabaseSessionDependency,
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)],
+) -> UserRead:
+    if credentials is None or (claims := await verify_jwt(credentials.credentials)) is None:
+        raise HTTPUnauthorizedException
+
+    try:
+        return await user_manager.fetch_authenticated(int(claims["sub"]), session)
+    except (KeyError, ValueError, HTTPNotFoundException) as exc:
+        raise HTTPUnauthorizedException from exc
+
+
+CurrentUserDependency = Annotated[UserRead, Depends(get_current_user)]
+
+
+async def get_http_session(request: Request) -> RedisSession:
+    session: RedisSession = request.scope["session"]
+    return await session.load()
+
+
+HTTPSessionDependency = Annotated[RedisSession, Depends(get_http_session)]
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Response, status
+from fastapi import APIRouter, Request, Response, status
 from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
-from fastapi.responses import HTMLResponse, PlainTextResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
+
+from app.utils.metrics import export
+from app.utils.warmup import check_readiness
 
 router = APIRouter(tags=["Miscellaneous"])
 
@@ -10,6 +13,21 @@ def healthcheck() -> Response:
     return Response(status_code=status.HTTP_200_OK)
 
 
+@router.get("/readyz")
+async def readiness(request: Request) -> JSONResponse:
+    checks = await check_readiness()
+    ready = request.app.state.ready and None not in checks.values()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"ready": ready, "checks_ms": checks},
+    )
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(await export(), media_type="text/plain; version=0.0.4")
+
+
 @router.get("/docs", include_in_schema=False)
 def swagger() -> HTMLResponse:
     return get_swagger_ui_html(openapi_url="/openapi.json", title="FastAPI")
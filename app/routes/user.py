@@ -1,14 +1,43 @@
-from typing import Any
+from itertools import batched
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Response, status
+from fastapi import APIRouter, Body, Response, status
+from fastapi.responses import StreamingResponse
 
 from app.database.models import User
+from app.jobs.queue import enqueue_many
+from app.jobs.tasks import import_users
 from app.manager.user import user_manager
-from app.routes.dependencies import DatabaseSessionDependency
-from app.schemas.user import UserCreate, UserRead, UserUpdate
-from app.utils.constants import DEFAULT_DESC, DEFAULT_ORDER_BY
+from app.routes.dependencies import (
+    CurrentUserDependency,
+    DatabaseSessionDependency,
+    ReadOnlyDatabaseSessionDependency,
+)
+from app.schemas.base import BatchItemRead, BatchUpdateItem
+from app.schemas.job import JobRead
+from app.schemas.user import UserCreate, UserImport, UserRead, UserUpdate
+from app.settings import settings
+from app.utils.constants import (
+    BATCH_SIZE_MAX,
+    DEFAULT_DESC,
+    DEFAULT_ORDER_BY,
+    JOBS_IMPORT_CHUNK_SIZE,
+    JOBS_IMPORT_SIZE_MAX,
+    STREAM_BATCH_SIZE_DEFAULT,
+)
+from app.utils.export import EXPORT_MEDIA_TYPES, ExportFormat, encode_export
+from app.utils.http_cache import cache_headers, is_not_modified, make_etag
 from app.utils.pagination import Page
-from app.utils.types import OrderByQuery, UserIdPath
+from app.utils.types import (
+    BatchSizeQuery,
+    ExportFormatQuery,
+    IfModifiedSinceHeader,
+    IfNoneMatchHeader,
+    OrderByQuery,
+    OverwritePasswordQuery,
+    UserFilterQuery,
+    UserIdPath,
+)
 
 router = APIRouter(tags=["Users"], prefix="/users")
 
@@ -17,6 +46,7 @@ router = APIRouter(tags=["Users"], prefix="/users")
     "",
     status_code=status.HTTP_200_OK,
     responses={
+        304: {"description": "Not Modified"},
         400: {
             "description": "Bad Request Error",
             "content": {"application/json": {"example": {"detail": "'Bad request' or 'Invalid value for 'orderBy'"}}},
@@ -25,15 +55,81 @@ router = APIRouter(tags=["Users"], prefix="/users")
     response_model=Page[UserRead],
 )
 async def fetch_users(
-    *, order_by: OrderByQuery = DEFAULT_ORDER_BY, desc: bool = DEFAULT_DESC, session: DatabaseSessionDependency
+    *,
+    order_by: OrderByQuery = DEFAULT_ORDER_BY,
+    desc: bool = DEFAULT_DESC,
+    query_filter: UserFilterQuery,
+    if_none_match: IfNoneMatchHeader = None,
+    response: Response,
+    session: ReadOnlyDatabaseSessionDependency,
 ) -> Any | None:
-    return await user_manager.fetch_paginated(order_by=order_by, desc=desc, session=session)
+    page = await user_manager.fetch_paginated(
+        filters=user_manager.get_filters(query_filter),
+        order_by=order_by,
+        desc=desc,
+        projection=UserRead,
+        session=session,
+    )
+
+    # Pages carry no Last-Modified: a deleted row changes the page without moving its newest `updated_at`.
+    etag = make_etag(page.items, page.total, page.previous_page, page.next_page)
+    headers = cache_headers(etag, cache_control=settings.list_cache_control)
+
+    if is_not_modified(etag, if_none_match=if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return page
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}},
+        400: {
+            "description": "Bad Request Error",
+            "content": {"application/json": {"example": {"detail": "'Bad request' or 'Invalid value for 'orderBy'"}}},
+        },
+    },
+    response_class=StreamingResponse,
+)
+async def export_users(
+    *,
+    export_format: ExportFormatQuery = ExportFormat.NDJSON,
+    batch_size: BatchSizeQuery = STREAM_BATCH_SIZE_DEFAULT,
+    order_by: OrderByQuery = DEFAULT_ORDER_BY,
+    desc: bool = DEFAULT_DESC,
+) -> StreamingResponse:
+    batches = user_manager.stream(order_by=order_by, desc=desc, batch_size=batch_size, projection=UserRead)
+
+    return StreamingResponse(
+        encode_export(UserRead, batches, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'},
+    )
+
+
+@router.get(
+    "/me",
+    status_code=status.HTTP_200_OK,
+    responses={
+        401: {
+            "description": "Unauthorized Error",
+            "content": {"application/json": {"example": {"detail": "Unauthorized"}}},
+        },
+    },
+    response_model=UserRead,
+)
+async def fetch_current_user(current_user: CurrentUserDependency) -> UserRead:
+    return current_user
 
 
 @router.get(
     "/{userId}",
     status_code=status.HTTP_200_OK,
     responses={
+        304: {"description": "Not Modified"},
         400: {
             "description": "Bad Request Error",
             "content": {"application/json": {"example": {"detail": "Bad request"}}},
@@ -45,8 +141,22 @@ async def fetch_users(
     },
     response_model=UserRead,
 )
-async def fetch_user(user_id: UserIdPath, session: DatabaseSessionDependency) -> User:
-    return await user_manager.fetch_one(id=user_id, session=session)
+async def fetch_user(
+    user_id: UserIdPath,
+    response: Response,
+    session: ReadOnlyDatabaseSessionDependency,
+    if_none_match: IfNoneMatchHeader = None,
+    if_modified_since: IfModifiedSinceHeader = None,
+) -> Any:
+    # The projected row carries the version too, so one query serves both the validator check and the response.
+    db_obj = await user_manager.fetch_one(id=user_id, projection=UserRead, session=session)
+    etag = make_etag([db_obj])
+
+    if is_not_modified(etag, db_obj.updated_at, if_none_match=if_none_match, if_modified_since=if_modified_since):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, db_obj.updated_at))
+
+    response.headers.update(cache_headers(etag, db_obj.updated_at))
+    return db_obj
 
 
 @router.post("", response_model=UserRead)
@@ -54,6 +164,47 @@ async def create_user(user_create: UserCreate, session: DatabaseSessionDependenc
     return await user_manager.create(user_create, session)
 
 
+@router.post("/batch", status_code=status.HTTP_200_OK, response_model=list[BatchItemRead[UserRead]])
+async def create_users(
+    user_creates: Annotated[list[UserCreate], Body(min_length=1, max_length=BATCH_SIZE_MAX)],
+    session: DatabaseSessionDependency,
+) -> Any:
+    return await user_manager.create_bulk(user_creates, session)
+
+
+@router.post("/import", status_code=status.HTTP_202_ACCEPTED, response_model=list[JobRead])
+async def import_users_in_background(
+    user_creates: Annotated[list[UserCreate], Body(min_length=1, max_length=JOBS_IMPORT_SIZE_MAX)],
+) -> Any:
+    # Passwords are hashed before they are enqueued, so no plaintext secret is stored in the stream.
+    payload = await user_manager.prepare_bulk(user_creates)
+    chunks = batched(
+        ({field: row[field] for field in UserImport.model_fields} for row in payload),
+        JOBS_IMPORT_CHUNK_SIZE,
+        strict=False,
+    )
+    job_ids = await enqueue_many(import_users, ({"users": list(chunk)} for chunk in chunks))
+    return [{"id": job_id} for job_id in job_ids]
+
+
+@router.put("/batch", status_code=status.HTTP_200_OK, response_model=list[UserRead])
+async def upsert_users(
+    user_creates: Annotated[list[UserCreate], Body(min_length=1, max_length=BATCH_SIZE_MAX)],
+    session: DatabaseSessionDependency,
+    *,
+    overwrite_password: OverwritePasswordQuery = False,
+) -> Any:
+    return await user_manager.upsert(user_creates, session, overwrite_write_only=overwrite_password)
+
+
+@router.patch("/batch", status_code=status.HTTP_200_OK, response_model=list[BatchItemRead[UserRead]])
+async def update_users(
+    user_updates: Annotated[list[BatchUpdateItem[UserUpdate]], Body(min_length=1, max_length=BATCH_SIZE_MAX)],
+    session: DatabaseSessionDependency,
+) -> Any:
+    return await user_manager.update_rows(user_updates, session)
+
+
 @router.patch(
     "/{userId}",
     status_code=status.HTTP_200_OK,
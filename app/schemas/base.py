@@ -1,6 +1,7 @@
 from datetime import UTC, datetime
+from enum import StrEnum
 
-from pydantic import AliasGenerator, BaseModel, ConfigDict, computed_field
+from pydantic import AliasGenerator, BaseModel, ConfigDict, PositiveInt, computed_field
 from pydantic.alias_generators import to_camel, to_snake
 
 
@@ -29,6 +30,11 @@ class BaseReadSchema(BaseModel):
     updated_at: datetime  # type: ignore[pydantic-alias]
 
 
+class VersionRead(BaseModel):
+    id: int
+    updated_at: datetime
+
+
 class BaseUpdateSchema(BaseModel):
     model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
 
@@ -36,3 +42,26 @@ class BaseUpdateSchema(BaseModel):
     @property
     def updated_at(self) -> datetime:
         return datetime.now(UTC)
+
+
+class BaseFilterSchema(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
+
+class BatchItemStatus(StrEnum):
+    CREATED = "created"
+    UPDATED = "updated"
+    CONFLICT = "conflict"
+    NOT_FOUND = "not_found"
+
+
+class BatchItemRead[ReadSchemaType: BaseModel](BaseModel):
+    index: int
+    status: BatchItemStatus
+    data: ReadSchemaType | None = None
+    detail: str | None = None
+
+
+class BatchUpdateItem[UpdateSchemaType: BaseModel](BaseModel):
+    id: PositiveInt
+    changes: UpdateSchemaType
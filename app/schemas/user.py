@@ -1,21 +1,48 @@
-from pydantic import BaseModel, EmailStr, Field
+from datetime import datetime
 
-from app.schemas.base import BaseCreateSchema, BaseReadSchema, BaseUpdateSchema
-from app.utils.mixins import EmailLowerCaseMixin, PasswordComplexityMixin, PasswordHashMixin
+from pydantic import BaseModel, EmailStr, Field, PositiveInt, field_validator
+
+from app.schemas.base import BaseCreateSchema, BaseFilterSchema, BaseReadSchema, BaseUpdateSchema
+from app.utils.constants import FILTER_VALUES_MAX
+from app.utils.mixins import EmailLowerCaseMixin, PasswordComplexityMixin
 
 
 class UserBase(BaseModel, EmailLowerCaseMixin):
     email: str
 
 
-class UserCreate(BaseCreateSchema, UserBase, PasswordComplexityMixin, PasswordHashMixin, EmailLowerCaseMixin):
+class UserCreate(BaseCreateSchema, UserBase, PasswordComplexityMixin, EmailLowerCaseMixin):
     email: EmailStr = Field(max_length=100)
     password: str = Field(max_length=50)
 
 
+class UserImport(BaseCreateSchema):
+    email: EmailStr = Field(max_length=100)
+    password: str = Field(max_length=100)
+
+
 class UserRead(BaseReadSchema, UserBase):
     pass
 
 
-class UserUpdate(BaseUpdateSchema):
+class UserUpdate(BaseUpdateSchema, EmailLowerCaseMixin):
     email: EmailStr | None = Field(None, max_length=100)
+
+
+class UserFilter(BaseFilterSchema):
+    id_in: list[PositiveInt] | None = Field(None, max_length=FILTER_VALUES_MAX)
+    email: str | None = Field(None, max_length=100)
+    email_in: list[str] | None = Field(None, max_length=FILTER_VALUES_MAX)
+    email_prefix: str | None = Field(None, min_length=1, max_length=100)
+    created_at_gte: datetime | None = None
+    created_at_lt: datetime | None = None
+    updated_at_gte: datetime | None = None
+    updated_at_lt: datetime | None = None
+
+    @field_validator("email", "email_in")
+    @classmethod
+    def lower_emails(cls, value: str | list[str] | None) -> str | list[str] | None:
+        # Emails are stored lowercased, so exact matches compare lowercased values like the prefix filter does.
+        if isinstance(value, list):
+            return [email.lower() for email in value]
+        return value.lower() if value else value
@@ -0,0 +1,25 @@
+import uvicorn
+
+from app.settings import settings
+
+
+def main() -> None:
+    # On SIGTERM uvicorn stops accepting connections and waits up to the graceful shutdown timeout for in-flight
+    # requests before running the lifespan shutdown, so deployments drain instead of dropping requests.
+    uvicorn.run(
+        "app.main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=settings.server_workers,
+        loop="uvloop",
+        http="httptools",
+        proxy_headers=True,
+        forwarded_allow_ips=settings.server_forwarded_allow_ips,
+        timeout_keep_alive=settings.server_keep_alive_seconds,
+        timeout_graceful_shutdown=settings.server_graceful_shutdown_seconds,
+        log_level=settings.log_level.lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -13,19 +15,86 @@ class Settings(BaseSettings):
     backend_host_url: str
     frontend_host_url: str
 
+    # Server
+    server_host: str = "0.0.0.0"  # noqa: S104
+    server_port: int = 80
+    server_workers: int = 1
+    server_keep_alive_seconds: int = 5
+    server_graceful_shutdown_seconds: int = 30
+    server_forwarded_allow_ips: str = "*"
+
     # Redis
     redis_host: str
     redis_port: int
     redis_password: str
+    redis_connection_budget: int = 20
+    redis_pool_timeout_seconds: int = 60
 
     # JWT
     jwt_secret_key: str
     jwt_expire_time_seconds: int
     jwt_algorithm: str
+    jwt_revocation_sync_seconds: int = 5
+    auth_user_cache_seconds: int = 5
+
+    # Startup
+    warmup_db_connections: int = 5
+    warmup_redis_connections: int = 5
+    warmup_timeout_seconds: int = 10
+    readiness_timeout_ms: int = 250
+
+    # Metrics
+    metrics_enabled: bool = True
+    metrics_publish_seconds: int = 5
+
+    # Jobs
+    jobs_concurrency: int = 10
+    jobs_batch_size: int = 50
+    jobs_block_ms: int = 1000
+    jobs_max_attempts: int = 5
+    jobs_retry_backoff_seconds: float = 1
+    jobs_retry_backoff_max_seconds: int = 300
+    jobs_visibility_timeout_seconds: int = 300
+    jobs_graceful_shutdown_seconds: int = 30
+    jobs_db_connection_budget: int = 10
+
+    # Sessions
+    session_cookie: str = "session"
+    session_max_age_seconds: int = 1209600
+    session_https_only: bool = False
+
+    # Passwords
+    password_hash_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_bulk_workers: int = 2
 
     # Database
     db_url: str
+    db_replica_urls: list[str] = []
+    db_replica_pin_seconds: int = 5
+    db_connection_budget: int = 45
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
     echo_sql: bool
+    sql_instrumentation: bool = True
+    sql_repeat_threshold: int = 10
+    sql_repeat_raise: bool = False
+
+    # Pagination
+    pagination_total_mode: Literal["exact", "approximate", "cached", "none"] = "exact"
+    pagination_total_cache_seconds: int = 60
+
+    # HTTP
+    list_cache_control: str = "private, no-cache"
+    compression_minimum_size: int = 1024
+    rate_limit_enabled: bool = True
+    rate_limit_default: str = "600/minute"
+    rate_limit_rules: dict[str, str] = {
+        "GET /healthcheck": "unlimited",
+        "GET /readyz": "unlimited",
+        "GET /metrics": "unlimited",
+    }
+    rate_limit_fail_open: bool = True
 
 
 settings = Settings()
@@ -1,45 +1,85 @@
 import asyncio
 import socket
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
 from functools import cache
-
-from redis import exceptions
-from redis.asyncio import BlockingConnectionPool, Redis
-from redis.asyncio.retry import Retry
-from redis.backoff import ConstantBackoff
+from typing import TYPE_CHECKING
 
 from app.settings import settings
 from app.utils.constants import ONE_MINUTE_SECONDS
 
+if TYPE_CHECKING:
+    from redis.asyncio import BlockingConnectionPool, Redis
+
 REDIS_MAX_RETRIES = 10
-REDIS_MAX_CONNECTIONS = 20
-REDIS_CACHE_RETRYABLE_ERRORS = (
-    ConnectionError,
-    exceptions.ConnectionError,
-    exceptions.TimeoutError,
-    exceptions.BusyLoadingError,
-    asyncio.exceptions.TimeoutError,
-    socket.gaierror,
-)
-
-
-def async_redis_connection_pool() -> BlockingConnectionPool:
-    return BlockingConnectionPool(
+
+
+def async_redis_connection_pool() -> "BlockingConnectionPool":
+    # redis is imported on first use, it is one of the slowest imports of the application.
+    from redis import exceptions  # noqa: PLC0415
+    from redis.asyncio.retry import Retry  # noqa: PLC0415
+    from redis.backoff import ConstantBackoff  # noqa: PLC0415
+
+    from app.utils.redis_pool import InstrumentedBlockingConnectionPool  # noqa: PLC0415
+
+    retryable_errors = (
+        ConnectionError,
+        exceptions.ConnectionError,
+        exceptions.TimeoutError,
+        exceptions.BusyLoadingError,
+        asyncio.exceptions.TimeoutError,
+        socket.gaierror,
+    )
+
+    return InstrumentedBlockingConnectionPool(
         host=settings.redis_host,
         port=settings.redis_port,
         password=settings.redis_password,
         decode_responses=True,
         socket_keepalive=True,
-        max_connections=REDIS_MAX_CONNECTIONS,
-        timeout=ONE_MINUTE_SECONDS,
+        max_connections=max(settings.redis_connection_budget // max(settings.server_workers, 1), 1),
+        timeout=settings.redis_pool_timeout_seconds,
         retry=Retry(
             backoff=ConstantBackoff(ONE_MINUTE_SECONDS),
             retries=REDIS_MAX_RETRIES,
-            supported_errors=REDIS_CACHE_RETRYABLE_ERRORS,  # type: ignore[arg-type]
+            supported_errors=retryable_errors,  # type: ignore[arg-type]
         ),
         protocol=3,
     )
 
 
 @cache
-def async_redis() -> Redis:
+def async_redis() -> "Redis":
+    from redis.asyncio import Redis  # noqa: PLC0415
+
     return Redis.from_pool(async_redis_connection_pool())
+
+
+class ExpiringLRUCache[KeyType: Hashable, ValueType]:
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[KeyType, tuple[ValueType, float]] = OrderedDict()
+
+    def get(self, key: KeyType) -> ValueType | None:
+        if (entry := self._entries.get(key)) is None:
+            return None
+
+        value, expires_at = entry
+
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: KeyType, value: ValueType, expires_at: float) -> None:
+        if self.maxsize <= 0 or expires_at <= time.time():
+            return
+
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
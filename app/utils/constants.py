@@ -2,15 +2,46 @@ from datetime import timedelta
 from pathlib import Path
 
 PROJECT_DIR = Path(__file__).parent.parent
+LOG_FORMAT = "%(levelname)-9s %(asctime)-15s [%(name)s] %(filename)s/%(funcName)s: %(message)s"
 
 DEFAULT_DESC = False
 DEFAULT_LIMIT = 100
 DEFAULT_OFFSET = 0
 DEFAULT_ORDER_BY = "id"
+FILTER_VALUES_MAX = 100
+
+BATCH_SIZE_MAX = 1000
+STREAM_BATCH_SIZE_DEFAULT = 1000
+STREAM_BATCH_SIZE_MAX = 10000
+POSTGRES_MAX_BIND_PARAMS = 32767
+UNIT_OF_WORK_KEY = "unit_of_work"
+
+AUTH_CACHE_SIZE = 10000
+REVOKED_TOKENS_CAPACITY = 100000
+REVOKED_TOKENS_KEY = "auth:revoked"
 
 ONE_MINUTE_SECONDS = int(timedelta(minutes=1).total_seconds())
 ONE_DAY_SECONDS = int(timedelta(days=1).total_seconds())
 
+SESSION_KEY_PREFIX = "session"
+JOBS_STREAM_KEY = "jobs"
+JOBS_CONSUMER_GROUP = "workers"
+JOBS_DEAD_MAX_LENGTH = 10000
+JOBS_PROMOTE_BATCH_SIZE = 1000
+JOBS_IMPORT_SIZE_MAX = 1000
+JOBS_IMPORT_CHUNK_SIZE = 100
+METRICS_KEY_PREFIX = "metrics"
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit"
+RATE_LIMIT_DENIED_CACHE_SIZE = 10000
+RATE_LIMIT_REDIS_TIMEOUT_SECONDS = 0.1
+RATE_LIMIT_PERIODS = {
+    "second": 1,
+    "minute": ONE_MINUTE_SECONDS,
+    "hour": ONE_MINUTE_SECONDS * 60,
+    "day": ONE_DAY_SECONDS,
+}
+
 ACCESS_TOKEN_EXPIRE_TIME_S = ONE_DAY_SECONDS * 3
 REFRESH_TOKEN_EXPIRE_TIME_S = ONE_DAY_SECONDS * 7
 TEMPORARY_TOKEN_EXPIRE_TIME_S = ONE_MINUTE_SECONDS * 5
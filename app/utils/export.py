@@ -0,0 +1,45 @@
+import csv
+import io
+from collections.abc import AsyncIterator, Sequence
+from enum import StrEnum
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+async def _encode_ndjson(schema: type[BaseModel], batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(schema.model_validate(obj).model_dump_json(by_alias=True).encode() + b"\n" for obj in batch)
+
+
+async def _encode_csv(schema: type[BaseModel], batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(field.serialization_alias or name for name, field in schema.model_fields.items())
+
+    async for batch in batches:
+        writer.writerows(schema.model_validate(obj).model_dump(mode="json").values() for obj in batch)
+        yield buffer.getvalue().encode()
+
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def encode_export(
+    schema: type[BaseModel], batches: AsyncIterator[Sequence[Any]], export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    if export_format == ExportFormat.CSV:
+        return _encode_csv(schema, batches)
+
+    return _encode_ndjson(schema, batches)
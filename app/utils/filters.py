@@ -0,0 +1,95 @@
+import inspect
+import operator
+import sys
+from collections.abc import Callable
+from enum import StrEnum
+from functools import cache
+from typing import Annotated, Any
+
+from fastapi import Query
+from pydantic import BaseModel
+from sqlalchemy import String, and_, func, inspect as sa_inspect
+
+
+class FilterOperator(StrEnum):
+    EQ = "eq"
+    IN = "in"
+    GT = "gt"
+    GTE = "gte"
+    LT = "lt"
+    LTE = "lte"
+    PREFIX = "prefix"
+
+
+def _prefix(column: Any, value: str) -> Any:
+    # A case-insensitive prefix is the byte-wise range [prefix, next prefix) on `lower(column)`, which a
+    # `text_pattern_ops` index serves even with a generic plan, unlike `LIKE` with a bound pattern.
+    lowered = func.lower(column)
+    prefix = value.lower()
+    clauses = [lowered.op("~>=~", is_comparison=True)(prefix)]
+
+    if (last := ord(prefix[-1])) < sys.maxunicode:
+        clauses.append(lowered.op("~<~", is_comparison=True)(prefix[:-1] + chr(last + 1)))
+
+    return and_(*clauses)
+
+
+FILTER_OPERATORS: dict[FilterOperator, Callable[[Any, Any], Any]] = {
+    FilterOperator.EQ: operator.eq,
+    FilterOperator.IN: lambda column, value: column.in_(value),
+    FilterOperator.GT: operator.gt,
+    FilterOperator.GTE: operator.ge,
+    FilterOperator.LT: operator.lt,
+    FilterOperator.LTE: operator.le,
+    FilterOperator.PREFIX: _prefix,
+}
+
+
+def parse_filter_field(name: str) -> tuple[str, FilterOperator]:
+    column, _, suffix = name.rpartition("_")
+
+    if column and suffix in FilterOperator.__members__.values():
+        return column, FilterOperator(suffix)
+
+    return name, FilterOperator.EQ
+
+
+def compile_filters(
+    filter_schema: type[BaseModel], db_model: type[Any], *, excluded: frozenset[str] = frozenset()
+) -> tuple[tuple[str, Any, FilterOperator], ...]:
+    columns = sa_inspect(db_model, raiseerr=True).columns
+    spec = []
+
+    for field in filter_schema.model_fields:
+        column_key, operator = parse_filter_field(field)
+
+        if column_key not in columns or column_key in excluded:
+            raise ValueError(f"{filter_schema.__name__}.{field} does not filter a column of {db_model.__name__}")
+
+        if operator is FilterOperator.PREFIX and not isinstance(columns[column_key].type, String):
+            raise ValueError(f"{filter_schema.__name__}.{field} uses a prefix filter on a non-string column")
+
+        spec.append((field, getattr(db_model, column_key), operator))
+
+    return tuple(spec)
+
+
+@cache
+def filter_query[FilterSchemaType: BaseModel](filter_schema: type[FilterSchemaType]) -> Callable[..., FilterSchemaType]:
+    # Exposes every field of the filter schema as its own query parameter, so they are documented and validated by
+    # FastAPI next to the other query parameters of the route.
+    def dependency(**kwargs: Any) -> FilterSchemaType:
+        return filter_schema.model_validate(kwargs)
+
+    dependency.__signature__ = inspect.Signature(  # type: ignore[attr-defined]
+        [
+            inspect.Parameter(
+                name,
+                inspect.Parameter.KEYWORD_ONLY,
+                default=field.default,
+                annotation=Annotated[field.annotation, *field.metadata, Query(alias=field.alias)],
+            )
+            for name, field in filter_schema.model_fields.items()
+        ]
+    )
+    return dependency
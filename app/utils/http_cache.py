@@ -0,0 +1,52 @@
+import hashlib
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+
+def make_etag(versions: Iterable[Any], *extra: Any) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+
+    for version in versions:
+        digest.update(f"{version.id}:{version.updated_at.isoformat()};".encode())
+
+    for value in extra:
+        digest.update(f"{value};".encode())
+
+    return f'W/"{digest.hexdigest()}"'
+
+
+def cache_headers(etag: str, last_modified: datetime | None = None, cache_control: str | None = None) -> dict[str, str]:
+    headers = {"ETag": etag}
+
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(UTC), usegmt=True)
+
+    if cache_control is not None:
+        headers["Cache-Control"] = cache_control
+
+    return headers
+
+
+def is_not_modified(
+    etag: str,
+    last_modified: datetime | None = None,
+    *,
+    if_none_match: str | None = None,
+    if_modified_since: str | None = None,
+) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since and uses weak comparison for GET requests.
+    if if_none_match is not None:
+        candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+
+    if if_modified_since is None or last_modified is None:
+        return False
+
+    try:
+        modified_since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    return modified_since.tzinfo is not None and last_modified.replace(microsecond=0) <= modified_since
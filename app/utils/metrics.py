@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from app.settings import settings
+from app.utils.cache import async_redis
+from app.utils.constants import METRICS_KEY_PREFIX
+from app.utils.singleflight import SingleFlightStats
+
+logger = logging.getLogger(__name__)
+
+type Samples = dict[str, dict[str, float]]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+FAMILIES = {
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by route template."),
+    "http_requests_in_flight": ("gauge", "HTTP requests currently being served."),
+    "db_pool_size": ("gauge", "Configured database pool size."),
+    "db_pool_checked_out": ("gauge", "Database connections checked out of the pool."),
+    "db_pool_overflow": ("gauge", "Database connections opened above the pool size."),
+    "db_pool_wait_seconds": ("histogram", "Time spent waiting for a database connection."),
+    "redis_pool_max_connections": ("gauge", "Configured Redis pool size."),
+    "redis_pool_in_use": ("gauge", "Redis connections checked out of the pool."),
+    "redis_pool_wait_seconds": ("histogram", "Time spent waiting for a Redis connection."),
+    "singleflight_leaders_total": ("counter", "Coalesced reads that executed the query, by manager."),
+    "singleflight_coalesced_total": ("counter", "Coalesced reads that joined a query already in flight, by manager."),
+}
+
+
+@dataclass(slots=True)
+class Histogram:
+    buckets: tuple[float, ...]
+    counts: list[int] = field(init=False)
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def samples(self, name: str, labels: str) -> dict[str, float]:
+        prefix = f"{labels}," if labels else ""
+        samples: dict[str, float] = {}
+        cumulative = 0
+
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts, strict=True):
+            cumulative += count
+            samples[f'{name}_bucket{{{prefix}le="{bound}"}}'] = cumulative
+
+        samples[f"{name}_sum{{{labels}}}"] = self.total
+        samples[f"{name}_count{{{labels}}}"] = cumulative
+        return samples
+
+
+@dataclass(slots=True)
+class Metrics:
+    # Only touched from the worker's event loop thread, so plain attributes need no locking.
+    requests: dict[tuple[str, str, int], Histogram] = field(default_factory=dict)
+    requests_in_flight: int = 0
+    db_pool_wait: Histogram = field(default_factory=lambda: Histogram(POOL_WAIT_BUCKETS))
+    redis_pool_wait: Histogram = field(default_factory=lambda: Histogram(POOL_WAIT_BUCKETS))
+    single_flights: dict[str, SingleFlightStats] = field(default_factory=dict)
+
+    def observe_request(self, method: str, route: str, status_code: int, duration: float) -> None:
+        if (histogram := self.requests.get(key := (method, route, status_code))) is None:
+            histogram = self.requests[key] = Histogram(LATENCY_BUCKETS)
+
+        histogram.observe(duration)
+
+
+metrics = Metrics()
+
+
+def _gauge(samples: Samples, name: str, value: float, labels: str = "") -> None:
+    samples[name][f"{name}{{{labels}}}"] = value
+
+
+def collect() -> Samples:
+    # Imported here because the engine module imports this one for the pool wait histogram.
+    from app.database.engine import session_manager  # noqa: PLC0415
+
+    samples: Samples = defaultdict(dict)
+
+    for (method, route, status_code), histogram in metrics.requests.items():
+        labels = f'method="{method}",route="{route}",status="{status_code}"'
+        samples["http_request_duration_seconds"] |= histogram.samples("http_request_duration_seconds", labels)
+
+    _gauge(samples, "http_requests_in_flight", metrics.requests_in_flight)
+    samples["db_pool_wait_seconds"] |= metrics.db_pool_wait.samples("db_pool_wait_seconds", "")
+    samples["redis_pool_wait_seconds"] |= metrics.redis_pool_wait.samples("redis_pool_wait_seconds", "")
+
+    for database, pool in session_manager.pools.items():
+        labels = f'database="{database}"'
+        _gauge(samples, "db_pool_size", pool.size(), labels)  # type: ignore[attr-defined]
+        _gauge(samples, "db_pool_checked_out", pool.checkedout(), labels)  # type: ignore[attr-defined]
+        _gauge(samples, "db_pool_overflow", max(pool.overflow(), 0), labels)  # type: ignore[attr-defined]
+
+    for manager, stats in metrics.single_flights.items():
+        labels = f'manager="{manager}"'
+        _gauge(samples, "singleflight_leaders_total", stats.leaders, labels)
+        _gauge(samples, "singleflight_coalesced_total", stats.coalesced, labels)
+
+    if async_redis.cache_info().currsize:
+        redis_pool = async_redis().connection_pool
+        _gauge(samples, "redis_pool_max_connections", redis_pool.max_connections)
+        _gauge(samples, "redis_pool_in_use", len(redis_pool._in_use_connections))
+
+    return samples
+
+
+def merge(snapshots: Iterable[Samples]) -> Samples:
+    merged: Samples = defaultdict(dict)
+
+    for snapshot in snapshots:
+        for family, family_samples in snapshot.items():
+            for sample, value in family_samples.items():
+                merged[family][sample] = merged[family].get(sample, 0) + value
+
+    return merged
+
+
+def render(samples: Samples) -> str:
+    lines = []
+
+    for family, (metric_type, description) in FAMILIES.items():
+        if not (family_samples := samples.get(family)):
+            continue
+
+        lines += [f"# HELP {family} {description}", f"# TYPE {family} {metric_type}"]
+        lines += [f"{sample.replace('{}', '')} {value}" for sample, value in family_samples.items()]
+
+    return "\n".join(lines) + "\n"
+
+
+def _worker_key() -> str:
+    return f"{METRICS_KEY_PREFIX}:{socket.gethostname()}:{os.getpid()}"
+
+
+async def publish() -> None:
+    await async_redis().set(_worker_key(), json.dumps(collect()), ex=settings.metrics_publish_seconds * 3)
+
+
+async def publish_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.metrics_publish_seconds)
+
+        try:
+            await publish()
+        except Exception:
+            logger.warning("Failed to publish worker metrics", exc_info=True)
+
+
+async def export() -> str:
+    # Each worker keeps its own counters, so with several workers the scraped one publishes a fresh snapshot and sums
+    # the latest snapshots of every worker on this host.
+    if settings.server_workers <= 1:
+        return render(collect())
+
+    await publish()
+    redis = async_redis()
+    keys = [key async for key in redis.scan_iter(match=f"{METRICS_KEY_PREFIX}:{socket.gethostname()}:*")]
+    return render(merge(json.loads(snapshot) for snapshot in await redis.mget(keys) if snapshot))
@@ -5,14 +5,6 @@ from typing import Any
 from pydantic import computed_field, field_validator, model_validator
 
 from app.exceptions.http import HTTPBadRequestException
-from app.utils.secrets import hash_secret
-
-
-class PasswordHashMixin:
-    @field_validator("password", mode="after", check_fields=False)
-    @classmethod
-    def hash_password(cls, v: str) -> str:
-        return hash_secret(v)
 
 
 class PasswordComplexityMixin:
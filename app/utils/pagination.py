@@ -1,33 +1,125 @@
-from typing import TypeVar
+import hashlib
+import logging
+from enum import StrEnum
+from typing import Any, TypeVar
 
+import orjson
 from fastapi import Query
-from fastapi_pagination.cursor import CursorPage
+from fastapi_pagination.cursor import CursorPage, CursorParams as BaseCursorParams
 from fastapi_pagination.customization import (
     CustomizedPage,
+    UseAdditionalFields,
     UseFieldsAliases,
     UseIncludeTotal,
     UseName,
+    UseParams,
     UseParamsFields,
     UseQuotedCursor,
 )
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.settings import settings
+from app.utils.cache import async_redis
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 PAGE_SIZE_DEFAULT = 10
+TOTAL_CACHE_KEY_PREFIX = "pagination:total"
+
+POSTGRES_DIALECT = postgresql.dialect()
+
+
+class TotalMode(StrEnum):
+    EXACT = "exact"
+    APPROXIMATE = "approximate"
+    CACHED = "cached"
+    NONE = "none"
+
+
+class CursorParams(BaseCursorParams):
+    total_mode: TotalMode | None = Query(None, alias="totalMode")
+
 
 Page = CustomizedPage[
     CursorPage[T],
     UseName("Paginated"),
-    UseIncludeTotal(True),  # noqa: FBT003
+    UseParams(CursorParams),
+    UseIncludeTotal(False),  # noqa: FBT003
     UseQuotedCursor(False),  # noqa: FBT003
     UseParamsFields(
         size=Query(PAGE_SIZE_DEFAULT, ge=1, le=100, alias="pageSize"),
         cursor=Query(None, alias="pageToken"),
     ),
+    UseAdditionalFields(total_mode=(TotalMode | None, None)),
     UseFieldsAliases(
         items="data",
         current_page="currentPage",
         current_page_backwards="currentPageBackwards",
         previous_page="previousPage",
         next_page="nextPage",
+        total_mode="totalMode",
     ),
 ]
+
+
+async def _exact_total(session: AsyncSession, query: Select[Any]) -> int:
+    return (await session.execute(select(func.count()).select_from(query.order_by(None).subquery()))).scalar_one()
+
+
+async def _approximate_total(session: AsyncSession, query: Select[Any]) -> int | None:
+    froms = query.get_final_froms()
+
+    if query.whereclause is None and len(froms) == 1:
+        table_name = POSTGRES_DIALECT.identifier_preparer.format_table(froms[0])
+        reltuples = (
+            await session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+                {"table_name": table_name},
+            )
+        ).scalar()
+        return reltuples if reltuples is not None and reltuples >= 0 else None
+
+    # Filter values stay bound parameters; only the SQL generated by the compiler is put in the statement text.
+    connection = await session.connection()
+    compiled = query.order_by(None).compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    parameters = tuple(params[name] for name in compiled.positiontup or ()) if compiled.positional else params
+    plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", parameters)).scalar_one()
+    plan = orjson.loads(plan) if isinstance(plan, str) else plan
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _cached_total(session: AsyncSession, query: Select[Any]) -> int:
+    compiled = query.order_by(None).compile(dialect=POSTGRES_DIALECT)
+    signature = hashlib.sha256(f"{compiled}|{sorted(compiled.params.items())!r}".encode()).hexdigest()
+    key = f"{TOTAL_CACHE_KEY_PREFIX}:{signature}"
+
+    if (cached := await async_redis().get(key)) is not None:
+        return int(cached)
+
+    total = await _exact_total(session, query)
+    await async_redis().set(key, total, ex=settings.pagination_total_cache_seconds)
+    return total
+
+
+async def count_total(session: AsyncSession, query: Select[Any], mode: TotalMode) -> tuple[int | None, TotalMode]:
+    match mode:
+        case TotalMode.NONE:
+            return None, mode
+
+        case TotalMode.APPROXIMATE:
+            if (total := await _approximate_total(session, query)) is not None:
+                return total, mode
+
+        case TotalMode.CACHED:
+            from redis.exceptions import RedisError  # noqa: PLC0415
+
+            try:
+                return await _cached_total(session, query), mode
+            except RedisError:
+                logger.warning("Failed to use the cached total, falling back to an exact count", exc_info=True)
+
+    return await _exact_total(session, query), TotalMode.EXACT
@@ -0,0 +1,16 @@
+import time
+from typing import Any
+
+from redis.asyncio import BlockingConnectionPool
+from redis.asyncio.connection import AbstractConnection
+
+from app.utils.metrics import metrics
+
+
+class InstrumentedBlockingConnectionPool(BlockingConnectionPool):
+    async def get_connection(self, command_name: Any = None, *keys: Any, **options: Any) -> AbstractConnection:
+        started_at = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        finally:
+            metrics.redis_pool_wait.observe(time.perf_counter() - started_at)
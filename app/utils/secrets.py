@@ -1,9 +1,40 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
 import bcrypt
 
+from app.settings import settings
+
+
+@cache
+def secrets_executor() -> ThreadPoolExecutor:
+    # bcrypt releases the GIL while hashing, so a thread pool gives real parallelism off the event loop.
+    return ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="secrets")
+
+
+@cache
+def bulk_secrets_executor() -> ThreadPoolExecutor:
+    # Batch requests hash on their own pool, so single sign-ups and logins never queue behind a whole batch.
+    return ThreadPoolExecutor(max_workers=settings.password_hash_bulk_workers, thread_name_prefix="secrets-bulk")
+
 
 def verify_secret(plain_secret: str, hashed_secret: str) -> bool:
     return bcrypt.checkpw(password=plain_secret.encode("utf-8"), hashed_password=hashed_secret.encode("utf-8"))
 
 
 def hash_secret(secret: str) -> str:
-    return bcrypt.hashpw(password=secret.encode("utf-8"), salt=bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(
+        password=secret.encode("utf-8"), salt=bcrypt.gensalt(rounds=settings.password_hash_rounds)
+    ).decode("utf-8")
+
+
+async def async_verify_secret(plain_secret: str, hashed_secret: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(
+        secrets_executor(), verify_secret, plain_secret, hashed_secret
+    )
+
+
+async def async_hash_secret(secret: str, *, bulk: bool = False) -> str:
+    executor = bulk_secrets_executor() if bulk else secrets_executor()
+    return await asyncio.get_running_loop().run_in_executor(executor, hash_secret, secret)
@@ -0,0 +1,46 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(slots=True)
+class SingleFlightStats:
+    leaders: int = 0
+    coalesced: int = 0
+
+
+@dataclass(slots=True)
+class _Flight:
+    task: asyncio.Task[Any]
+    waiters: int = 0
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, _Flight] = {}
+        self.stats = SingleFlightStats()
+
+    async def do[ResultType](self, key: Hashable, func: Callable[[], Awaitable[ResultType]]) -> ResultType:
+        if (flight := self._flights.get(key)) is not None:
+            self.stats.coalesced += 1
+
+        else:
+            self.stats.leaders += 1
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(func()))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+
+        flight.waiters += 1
+        try:
+            # Shielded so that a cancelled caller does not cancel the query the other callers are waiting on.
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+
+            if not flight.waiters and not flight.task.done():
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -1,13 +1,23 @@
+import asyncio
+import logging
+import time
 from datetime import UTC, datetime, timedelta
+from functools import cache
 from typing import Any
+from uuid import uuid4
 
 from jwt import PyJWTError, decode, encode
 
 from app.settings import settings
+from app.utils.bloom import BloomFilter
+from app.utils.cache import ExpiringLRUCache, async_redis
+from app.utils.constants import AUTH_CACHE_SIZE, REVOKED_TOKENS_CAPACITY, REVOKED_TOKENS_KEY
+
+logger = logging.getLogger(__name__)
 
 
 def create_jwt(*, data: dict[str, Any] | None = None, expire_time_s: int | None = None) -> str:
-    data = data or {}
+    data = {"jti": uuid4().hex, **(data or {})}
     if expire_time_s:
         data.update({"exp": datetime.now(UTC) + timedelta(seconds=expire_time_s)})
     return encode(data, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
@@ -18,3 +28,81 @@ def decode_jwt(token: str) -> dict[str, Any] | None:
         return decode(token, settings.jwt_secret_key, algorithms=settings.jwt_algorithm)
     except PyJWTError:
         return None
+
+
+class RevocationList:
+    def __init__(self, sync_seconds: int) -> None:
+        self.sync_seconds = sync_seconds
+        self._bloom = BloomFilter(REVOKED_TOKENS_CAPACITY)
+        self._fresh_until = 0.0
+        self._sync_task: asyncio.Task[None] | None = None
+
+    async def _sync(self) -> None:
+        started_at = time.monotonic()
+        redis = async_redis()
+        await redis.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", time.time())
+        revoked = await redis.zrange(REVOKED_TOKENS_KEY, 0, -1)
+
+        bloom = BloomFilter(max(REVOKED_TOKENS_CAPACITY, len(revoked)))
+        for jti in revoked:
+            bloom.add(jti)
+
+        self._bloom = bloom
+        self._fresh_until = started_at + self.sync_seconds
+
+    async def _is_fresh(self) -> bool:
+        if time.monotonic() >= self._fresh_until:
+            from redis.exceptions import RedisError  # noqa: PLC0415
+
+            # Concurrent requests share one sync, which a cancelled request does not cancel for the others.
+            if self._sync_task is None or self._sync_task.done():
+                self._sync_task = asyncio.create_task(self._sync())
+
+            try:
+                await asyncio.shield(self._sync_task)
+            except RedisError as exc:
+                logger.warning("Failed to sync the token revocation list: %r", exc)
+
+        return time.monotonic() < self._fresh_until
+
+    async def is_revoked(self, jti: str) -> bool:
+        # The local filter is rebuilt from Redis every `sync_seconds`; a token it has never seen is clean without a
+        # round trip, so a revocation made by another process takes effect within one sync interval. Until a sync
+        # succeeds, or once it is out of date, every token is looked up in Redis instead.
+        if self.sync_seconds > 0 and await self._is_fresh() and jti not in self._bloom:
+            return False
+
+        return await async_redis().zscore(REVOKED_TOKENS_KEY, jti) is not None
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        await async_redis().zadd(REVOKED_TOKENS_KEY, {jti: expires_at})
+        self._bloom.add(jti)
+
+
+@cache
+def revocation_list() -> RevocationList:
+    return RevocationList(settings.jwt_revocation_sync_seconds)
+
+
+@cache
+def claims_cache() -> ExpiringLRUCache[str, dict[str, Any]]:
+    return ExpiringLRUCache(AUTH_CACHE_SIZE)
+
+
+async def verify_jwt(token: str) -> dict[str, Any] | None:
+    # Verified claims are cached until the token expires, which skips the signature check on repeated requests.
+    if (claims := claims_cache().get(token)) is None:
+        if (claims := decode_jwt(token)) is None:
+            return None
+
+        if "exp" in claims:
+            claims_cache().set(token, claims, claims["exp"])
+
+    if "jti" in claims and await revocation_list().is_revoked(claims["jti"]):
+        return None
+
+    return claims
+
+
+async def revoke_jwt(claims: dict[str, Any]) -> None:
+    await revocation_list().revoke(claims["jti"], claims.get("exp", time.time() + settings.jwt_expire_time_seconds))
@@ -1,8 +1,19 @@
 from typing import Annotated
 
-from fastapi import Path, Query
+from fastapi import Depends, Header, Path, Query
 from pydantic import PositiveInt
 
+from app.schemas.user import UserFilter
+from app.utils.constants import STREAM_BATCH_SIZE_MAX
+from app.utils.export import ExportFormat
+from app.utils.filters import filter_query
+
 OrderByQuery = Annotated[str, Query(alias="orderBy")]
 UserIdPath = Annotated[PositiveInt, Path(alias="userId")]
 UserIdQuery = Annotated[PositiveInt, Query(alias="userId")]
+BatchSizeQuery = Annotated[int, Query(alias="batchSize", ge=1, le=STREAM_BATCH_SIZE_MAX)]
+ExportFormatQuery = Annotated[ExportFormat, Query(alias="format")]
+OverwritePasswordQuery = Annotated[bool, Query(alias="overwritePassword")]
+IfNoneMatchHeader = Annotated[str | None, Header(alias="If-None-Match")]
+IfModifiedSinceHeader = Annotated[str | None, Header(alias="If-Modified-Since")]
+UserFilterQuery = Annotated[UserFilter, Depends(filter_query(UserFilter))]
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+
+from fastapi import FastAPI
+
+from app.database.engine import session_manager
+from app.manager.user import user_manager
+from app.settings import settings
+from app.utils.cache import async_redis
+
+logger = logging.getLogger(__name__)
+
+MANAGERS = (user_manager,)
+
+
+async def _warm_database(barrier: asyncio.Barrier, *, read_only: bool) -> None:
+    try:
+        async with session_manager.session(read_only=read_only) as session:
+            for manager in MANAGERS:
+                await manager.warmup(session)
+
+            # Every session keeps its connection until all have run, so each warmup lands on a different connection.
+            await barrier.wait()
+    except BaseException:
+        # A failed session breaks the barrier, so the others release their connections instead of waiting forever.
+        await barrier.abort()
+        raise
+
+
+async def _warm_redis() -> None:
+    await async_redis().ping()
+
+
+async def warmup(app: FastAPI) -> None:
+    started_at = time.perf_counter()
+    connections = min(settings.warmup_db_connections, session_manager.pool_size)
+    sessions = [False, True] if session_manager.has_replicas else [False]
+    barrier = asyncio.Barrier(max(connections * len(sessions), 1))
+
+    try:
+        # Bounded as a whole: the Redis client retries a refused connection for minutes before giving up.
+        async with asyncio.timeout(settings.warmup_timeout_seconds), asyncio.TaskGroup() as task_group:
+            for read_only in sessions:
+                for _ in range(connections):
+                    task_group.create_task(_warm_database(barrier, read_only=read_only))
+
+            for _ in range(settings.warmup_redis_connections):
+                task_group.create_task(_warm_redis())
+    except Exception:
+        logger.exception("Warmup failed, serving cold")
+
+    app.openapi()
+    logger.info("Warmup finished in %.2f ms", (time.perf_counter() - started_at) * 1000)
+
+
+async def _timed(name: str, check: Awaitable[object]) -> tuple[str, float | None]:
+    started_at = time.perf_counter()
+
+    try:
+        async with asyncio.timeout(settings.readiness_timeout_ms / 1000):
+            await check
+    except Exception:
+        logger.warning("Readiness check %s failed", name, exc_info=True)
+        return name, None
+
+    return name, (time.perf_counter() - started_at) * 1000
+
+
+async def check_readiness() -> dict[str, float | None]:
+    return dict(await asyncio.gather(_timed("database", session_manager.ping()), _timed("redis", async_redis().ping())))
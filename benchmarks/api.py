@@ -0,0 +1,182 @@
+"""Drive `/users` endpoints of `app.main:app` in-process and report throughput, latency and allocations.
+
+Usage: `python -m benchmarks.api --scenarios list get create patch delete --concurrency 16 --requests 2000 \
+--dataset-size 10000 --save baseline.json`
+
+Compare a run against a saved report with `--baseline baseline.json --threshold 0.1`; the process exits with status 1
+when any scenario's throughput drops or p95 latency grows by more than the threshold. Requires the PostgreSQL database
+from `DB_URL` with migrations applied and the Redis instance from `REDIS_*`. Seeded rows are removed afterwards.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from httpx import AsyncClient, Response
+
+from app.database.engine import session_manager
+from app.database.models import User
+from app.manager.user import user_manager
+from app.utils.secrets import hash_secret
+from benchmarks.utils import asgi_client, latency_summary, write_report
+
+PASSWORD = "Benchmark1"  # noqa: S105
+SCENARIOS = ("list", "get", "create", "patch", "delete")
+
+type Request = Callable[[AsyncClient, int], Awaitable[Response]]
+
+
+async def _seed(email_prefix: str, count: int) -> list[int]:
+    password = hash_secret(PASSWORD)
+    now = datetime.now(UTC)
+    payload = [
+        {"email": f"{email_prefix}-{index}@example.com", "password": password, "created_at": now, "updated_at": now}
+        for index in range(count)
+    ]
+
+    async with session_manager.session() as session:
+        db_objs = await user_manager.repository.create_bulk(payload, session)
+
+    return [db_obj.id for db_obj in db_objs]
+
+
+def _requests(email_prefix: str, user_ids: list[int], delete_ids: Iterator[int], page_size: int) -> dict[str, Request]:
+    return {
+        "list": lambda client, _: client.get("/users", params={"pageSize": page_size}),
+        "get": lambda client, n: client.get(f"/users/{user_ids[n % len(user_ids)]}"),
+        "create": lambda client, n: client.post(
+            "/users", json={"email": f"{email_prefix}-c{n}@example.com", "password": PASSWORD}
+        ),
+        "patch": lambda client, n: client.patch(
+            f"/users/{user_ids[n % len(user_ids)]}", json={"email": f"{email_prefix}-p{n}@example.com"}
+        ),
+        "delete": lambda client, _: client.delete(f"/users/{next(delete_ids)}"),
+    }
+
+
+async def _load(
+    client: AsyncClient, request: Request, *, requests: int, concurrency: int, offset: int = 0
+) -> dict[str, Any]:
+    counter = itertools.count(offset)
+    samples: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+
+        while (n := next(counter)) < offset + requests:
+            started_at = time.perf_counter()
+            response = await request(client, n)
+            samples.append(time.perf_counter() - started_at)
+            errors += response.is_error
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    return {"throughput_rps": len(samples) / elapsed, "errors": errors, "latency": latency_summary(samples)}
+
+
+async def _allocations(client: AsyncClient, request: Request, *, requests: int, offset: int) -> dict[str, float]:
+    peaks: list[int] = []
+    tracemalloc.start()
+
+    try:
+        for n in range(offset, offset + requests):
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await request(client, n)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return {"peak_kib_per_request": sum(peaks) / len(peaks) / 1024 if peaks else 0.0}
+
+
+def _compare(report: dict[str, Any], baseline: dict[str, Any], threshold: float) -> dict[str, Any]:
+    comparison: dict[str, Any] = {}
+
+    for name, result in report["scenarios"].items():
+        if (previous := baseline.get("scenarios", {}).get(name)) is None:
+            continue
+
+        throughput_change = result["throughput_rps"] / previous["throughput_rps"] - 1
+        p95_change = result["latency"]["p95_ms"] / previous["latency"]["p95_ms"] - 1
+        comparison[name] = {
+            "throughput_change": throughput_change,
+            "p95_change": p95_change,
+            "regressed": throughput_change < -threshold or p95_change > threshold,
+        }
+
+    return comparison
+
+
+async def main(args: argparse.Namespace) -> bool:
+    email_prefix = f"bench-{uuid4().hex[:8]}"
+    total = args.warmup + args.requests + args.alloc_requests
+    report: dict[str, Any] = {
+        "benchmark": "api",
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "dataset_size": args.dataset_size,
+            "page_size": args.page_size,
+        },
+        "scenarios": {},
+    }
+
+    async with asgi_client() as client:
+        try:
+            user_ids = await _seed(email_prefix, args.dataset_size)
+            delete_ids = iter(await _seed(f"{email_prefix}-d", total if "delete" in args.scenarios else 0))
+            requests = _requests(email_prefix, user_ids, delete_ids, args.page_size)
+
+            for name in args.scenarios:
+                await _load(client, requests[name], requests=args.warmup, concurrency=args.concurrency)
+                result = await _load(
+                    client, requests[name], requests=args.requests, concurrency=args.concurrency, offset=args.warmup
+                )
+                result |= await _allocations(
+                    client, requests[name], requests=args.alloc_requests, offset=args.warmup + args.requests
+                )
+                report["scenarios"][name] = result
+        finally:
+            async with session_manager.session() as session:
+                await user_manager.delete_bulk(session, filters=[User.email.startswith(email_prefix)])
+
+    regressed = False
+
+    if args.baseline:
+        report["comparison"] = _compare(report, json.loads(args.baseline.read_text()), args.threshold)
+        regressed = any(result["regressed"] for result in report["comparison"].values())
+
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2) + "\n")
+
+    write_report(report)
+    return not regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--alloc-requests", type=int, default=50)
+    parser.add_argument("--dataset-size", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--save", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1)
+
+    if not asyncio.run(main(parser.parse_args())):
+        raise SystemExit(1)
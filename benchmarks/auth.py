@@ -0,0 +1,74 @@
+"""Measure the overhead of bearer-token authentication with and without the verified-token and user caches.
+
+Usage: `python -m benchmarks.auth --requests 2000`
+
+`anonymous` fetches a user by ID without a token as the baseline. `uncached` disables the claims cache, the
+revocation bloom filter and the authenticated-user cache, so every `GET /users/me` verifies the signature, asks Redis
+and loads the user. `cached` runs with the configured caches. Requires the PostgreSQL database from `DB_URL` with at
+least one user and the Redis server from `REDIS_HOST`.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from httpx import AsyncClient
+
+from app.database.engine import session_manager
+from app.manager.user import user_manager
+from app.settings import settings
+from app.utils.constants import AUTH_CACHE_SIZE
+from app.utils.tokens import claims_cache, create_jwt, revocation_list
+from benchmarks.utils import asgi_client, latency_summary, write_report
+
+
+async def _run(client: AsyncClient, url: str, headers: dict[str, str], requests: int) -> dict[str, Any]:
+    samples: list[float] = []
+    cpu_started_at = time.process_time()
+
+    for _ in range(requests):
+        started_at = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        samples.append(time.perf_counter() - started_at)
+        response.raise_for_status()
+
+    cpu_us = (time.process_time() - cpu_started_at) / requests * 1_000_000
+    return {"cpu_us_per_request": cpu_us, "latency": latency_summary(samples)}
+
+
+def _configure(*, cached: bool) -> None:
+    claims_cache().maxsize = AUTH_CACHE_SIZE if cached else 0
+    revocation_list().sync_seconds = settings.jwt_revocation_sync_seconds if cached else 0
+    user_manager.authenticated_cache.maxsize = AUTH_CACHE_SIZE if cached else 0
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with asgi_client() as client:
+        async with session_manager.session(read_only=True) as session:
+            user = await user_manager.fetch_one(session=session)
+
+        token = create_jwt(data={"sub": str(user.id)}, expire_time_s=settings.jwt_expire_time_seconds)
+        scenarios = {
+            "anonymous": (f"/users/{user.id}", {}),
+            "uncached": ("/users/me", {"Authorization": f"Bearer {token}"}),
+            "cached": ("/users/me", {"Authorization": f"Bearer {token}"}),
+        }
+        report: dict[str, Any] = {"benchmark": "auth", "requests": args.requests}
+
+        for name, (url, headers) in scenarios.items():
+            _configure(cached=name == "cached")
+            await _run(client, url, headers, args.warmup)
+            report[name] = await _run(client, url, headers, args.requests)
+
+        for name in ("uncached", "cached"):
+            report[name]["overhead_us"] = report[name]["cpu_us_per_request"] - report["anonymous"]["cpu_us_per_request"]
+
+    write_report(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,69 @@
+"""Measure bytes saved and CPU cost of each available response encoding by page size.
+
+Usage: `python -m benchmarks.compression --page-sizes 1 10 100 --iterations 200`
+
+Payloads are synthetic `GET /users` pages serialized the way the API returns them, so no database is needed. zstd and
+brotli are included when the `zstandard` and `brotli` packages are installed.
+"""
+
+import argparse
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+import orjson
+
+from app.middleware.compression import ENCODERS
+from benchmarks.utils import write_report
+
+
+def _page(page_size: int) -> bytes:
+    now = datetime.now(UTC).isoformat()
+    items = [
+        {"email": f"user-{index}@example.com", "id": index, "createdAt": now, "updatedAt": now}
+        for index in range(page_size)
+    ]
+    return orjson.dumps({
+        "data": items,
+        "total": 100000,
+        "currentPage": "Pg==",
+        "currentPageBackwards": "PGk6Mjg=",
+        "previousPage": None,
+        "nextPage": "Pmk6MjY=",
+        "totalMode": "exact",
+    })
+
+
+def _measure(encoding: str, body: bytes, iterations: int) -> dict[str, float]:
+    started_at = time.process_time()
+
+    for _ in range(iterations):
+        compressed = ENCODERS[encoding]().compress(body, final=True)
+
+    elapsed = time.process_time() - started_at
+    return {
+        "bytes": len(compressed),
+        "bytes_saved": len(body) - len(compressed),
+        "ratio": len(compressed) / len(body),
+        "cpu_us_per_response": elapsed / iterations * 1_000_000,
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    report: dict[str, Any] = {"benchmark": "compression", "encodings": list(ENCODERS), "page_sizes": {}}
+
+    for page_size in args.page_sizes:
+        body = _page(page_size)
+        report["page_sizes"][page_size] = {
+            "bytes": len(body),
+            **{encoding: _measure(encoding, body, args.iterations) for encoding in ENCODERS},
+        }
+
+    write_report(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-sizes", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--iterations", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,92 @@
+"""Report cold import time per module and fail when startup exceeds a budget.
+
+Usage: `python -m benchmarks.import_time --max-ms 1500 --top 20`
+
+Every run imports the target in a fresh interpreter with `-X importtime` and the fastest run is reported, with the
+slowest modules by cumulative time and the self time per top-level package. `app.database.migrations.env` runs the
+migrations when imported, so its target imports what `env.py` imports instead. The check fails when a target takes
+longer than `--max-ms` or loads one of the modules the application defers to first use.
+"""
+
+import argparse
+import subprocess  # noqa: S404
+import sys
+from collections import defaultdict
+from typing import Any
+
+from benchmarks.utils import write_report
+
+TARGETS = {
+    "app.main": "import app.main",
+    "app.database.migrations.env": "import alembic.context, app.database.base, app.database.models, app.settings",
+}
+LAZY_MODULES = frozenset({"asyncpg", "redis"})
+
+
+def _import_times(statement: str) -> list[tuple[str, int, int, int]]:
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    )
+    entries = []
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+
+    return entries
+
+
+def _profile(statement: str, repeat: int, top: int) -> dict[str, Any]:
+    totals: list[int] = []
+    modules: defaultdict[str, list[int]] = defaultdict(list)
+    packages: defaultdict[str, list[int]] = defaultdict(list)
+
+    for _ in range(repeat):
+        entries = _import_times(statement)
+        totals.append(sum(cumulative_us for _, depth, _, cumulative_us in entries if depth == 0))
+        run_packages: defaultdict[str, int] = defaultdict(int)
+
+        for name, _, self_us, cumulative_us in entries:
+            modules[name].append(cumulative_us)
+            run_packages[name.partition(".")[0]] += self_us
+
+        for package, self_us in run_packages.items():
+            packages[package].append(self_us)
+
+    slowest_modules = sorted(modules, key=lambda name: min(modules[name]), reverse=True)[:top]
+    slowest_packages = sorted(packages, key=lambda name: min(packages[name]), reverse=True)[:top]
+
+    return {
+        "total_ms": min(totals) / 1000,
+        "modules_ms": {name: min(modules[name]) / 1000 for name in slowest_modules},
+        "packages_self_ms": {name: min(packages[name]) / 1000 for name in slowest_packages},
+        "eager_lazy_modules": sorted(LAZY_MODULES & {name.partition(".")[0] for name in modules}),
+    }
+
+
+def main(args: argparse.Namespace) -> bool:
+    report: dict[str, Any] = {"benchmark": "import_time", "repeat": args.repeat, "max_ms": args.max_ms}
+
+    for target in args.targets:
+        report[target] = _profile(TARGETS[target], args.repeat, args.top)
+
+    write_report(report)
+    return all(
+        report[target]["total_ms"] <= args.max_ms and not report[target]["eager_lazy_modules"]
+        for target in args.targets
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, default=1500.0)
+
+    if not main(parser.parse_args()):
+        raise SystemExit(1)
@@ -0,0 +1,102 @@
+"""Check that walking a large table with `iter_batches` keeps memory bounded.
+
+Usage: `python -m benchmarks.iter_batches --rows 1000000 --batch-size 1000 --max-peak-mib 64`
+
+Seeds `--rows` users with a single `INSERT ... SELECT generate_series(...)`, walks them in keyset batches and reports
+the traced memory peak and throughput; `--compare-fetch-bulk` also loads the same rows with `fetch_bulk` for
+reference. The process exits with status 1 when the `iter_batches` peak exceeds `--max-peak-mib`. Requires the
+PostgreSQL database from `DB_URL` with migrations applied. Seeded rows are removed afterwards.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import func, insert, literal, select
+
+from app.database.engine import session_manager
+from app.database.models import User
+from app.manager.user import user_manager
+from benchmarks.utils import write_report
+
+MIB = 1024 * 1024
+
+
+async def _seed(email_prefix: str, rows: int) -> None:
+    index = func.generate_series(1, rows).table_valued("value").render_derived()
+    now = func.now()
+
+    async with session_manager.session() as session:
+        await session.execute(
+            insert(User).from_select(
+                ["email", "password", "created_at", "updated_at"],
+                select(
+                    literal(f"{email_prefix}-") + index.c.value.cast(User.email.type) + "@example.com",
+                    literal(""),
+                    now,
+                    now,
+                ),
+            )
+        )
+        await session.commit()
+
+
+async def _traced(func: Callable[[], Awaitable[int]]) -> dict[str, float]:
+    tracemalloc.start()
+    started_at = time.perf_counter()
+
+    try:
+        rows = await func()
+        elapsed = time.perf_counter() - started_at
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"rows": rows, "rows_per_second": rows / elapsed, "peak_mib": peak / MIB}
+
+
+async def main(args: argparse.Namespace) -> bool:
+    email_prefix = f"bench-{uuid4().hex[:8]}"
+    filters = [User.email.startswith(email_prefix)]
+    report: dict[str, Any] = {"benchmark": "iter_batches", "rows": args.rows, "batch_size": args.batch_size}
+
+    async def iterate() -> int:
+        rows = 0
+
+        async for batch in user_manager.iter_batches(filters=filters, batch_size=args.batch_size):
+            rows += len(batch)
+
+        return rows
+
+    async def fetch_bulk() -> int:
+        async with session_manager.session(read_only=True) as session:
+            return len(await user_manager.repository.fetch_bulk(filters=filters, session=session) or [])
+
+    await _seed(email_prefix, args.rows)
+
+    try:
+        report["iter_batches"] = await _traced(iterate)
+
+        if args.compare_fetch_bulk:
+            report["fetch_bulk"] = await _traced(fetch_bulk)
+    finally:
+        async with session_manager.session() as session:
+            await user_manager.delete_bulk(session, filters=filters)
+
+    write_report(report)
+    return bool(report["iter_batches"]["peak_mib"] <= args.max_peak_mib)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-peak-mib", type=float, default=64.0)
+    parser.add_argument("--compare-fetch-bulk", action="store_true")
+
+    if not asyncio.run(main(parser.parse_args())):
+        raise SystemExit(1)
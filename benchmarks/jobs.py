@@ -0,0 +1,90 @@
+"""Measure job queue throughput and Redis round trips per job.
+
+Usage: `python -m benchmarks.jobs --jobs 5000 --job-ms 5`
+
+Enqueues `--jobs` jobs that sleep for `--job-ms` milliseconds on a dedicated stream, then runs one worker until all of
+them are processed. `unbatched` reads one job per round trip, `batched` reads up to `JOBS_BATCH_SIZE` jobs per round
+trip and acknowledges them in one pipeline per loop. Requires the Redis server from `REDIS_HOST`.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from app.jobs.queue import enqueue_many, job
+from app.jobs.worker import Message, Worker
+from app.settings import settings
+from app.utils.cache import async_redis
+from benchmarks.utils import write_report
+
+STREAM_KEY = "jobs:benchmark"
+
+
+@job
+async def benchmark_sleep(seconds: float) -> None:
+    await asyncio.sleep(seconds)
+
+
+class CountingWorker(Worker):
+    round_trips = 0
+    target = 0
+
+    async def _read(self, count: int) -> list[Message]:
+        self.round_trips += 1
+        return await super()._read(count)
+
+    async def _flush(self) -> None:
+        self.round_trips += 1
+        await super()._flush()
+
+    async def _execute(self, message_id: str, fields: dict[str, str]) -> None:
+        await super()._execute(message_id, fields)
+
+        if self.processed >= self.target:
+            self.stop()
+
+
+async def _run(args: argparse.Namespace, batch_size: int) -> dict[str, Any]:
+    redis = async_redis()
+    await redis.delete(STREAM_KEY, f"{STREAM_KEY}:delayed", f"{STREAM_KEY}:dead")
+
+    started_at = time.perf_counter()
+    await enqueue_many(benchmark_sleep, [{"seconds": args.job_ms / 1000}] * args.jobs, stream=STREAM_KEY)
+    enqueue_seconds = time.perf_counter() - started_at
+
+    worker = CountingWorker(stream=STREAM_KEY, concurrency=args.concurrency, batch_size=batch_size, block_ms=100)
+    worker.target = args.jobs
+    started_at = time.perf_counter()
+    await worker.run()
+    process_seconds = time.perf_counter() - started_at
+    await redis.delete(STREAM_KEY, f"{STREAM_KEY}:delayed", f"{STREAM_KEY}:dead")
+
+    return {
+        "batch_size": batch_size,
+        "enqueued_per_second": round(args.jobs / enqueue_seconds),
+        "processed_per_second": round(args.jobs / process_seconds),
+        "round_trips_per_job": round(worker.round_trips / args.jobs, 3),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    report: dict[str, Any] = {
+        "benchmark": "jobs",
+        "jobs": args.jobs,
+        "job_ms": args.job_ms,
+        "concurrency": args.concurrency,
+    }
+
+    for name, batch_size in (("unbatched", 1), ("batched", settings.jobs_batch_size)):
+        report[name] = await _run(args, batch_size)
+
+    write_report(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--job-ms", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, default=settings.jobs_concurrency)
+    asyncio.run(main(parser.parse_args()))
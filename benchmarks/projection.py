@@ -0,0 +1,59 @@
+"""Compare ORM and column-projection throughput for 100-row `GET /users` pages.
+
+Usage: `python -m benchmarks.projection --pages 500 --page-size 100`
+
+Each iteration runs the repository query and validates the rows into `UserRead`, which is the work a list endpoint
+does before serialization. Requires the PostgreSQL database from `DB_URL` with at least one page of users.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from fastapi_pagination.api import set_page, set_params
+
+from app.database.engine import session_manager
+from app.manager.user import user_manager
+from app.schemas.user import UserRead
+from app.utils.pagination import Page
+from benchmarks.utils import latency_summary, write_report
+
+
+async def _run(projection: type[UserRead] | None, pages: int) -> dict[str, Any]:
+    samples: list[float] = []
+
+    async with session_manager.session(read_only=True) as session:
+        for _ in range(pages):
+            started_at = time.perf_counter()
+            page = await user_manager.fetch_paginated(projection=projection, session=session)
+            [UserRead.model_validate(item) for item in page.items]
+            samples.append(time.perf_counter() - started_at)
+
+    return {"pages_per_second": len(samples) / sum(samples), "latency": latency_summary(samples)}
+
+
+async def main(args: argparse.Namespace) -> None:
+    page_cls = Page[UserRead]
+    params = page_cls.__params_type__.model_validate({"pageSize": args.page_size, "totalMode": "none"})
+
+    with set_page(page_cls), set_params(params):
+        await _run(None, args.warmup)
+        orm = await _run(None, args.pages)
+        projection = await _run(UserRead, args.pages)
+
+    write_report({
+        "benchmark": "projection",
+        "page_size": args.page_size,
+        "orm": orm,
+        "projection": projection,
+        "speedup": projection["pages_per_second"] / orm["pages_per_second"],
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
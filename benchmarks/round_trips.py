@@ -0,0 +1,121 @@
+"""Count database round trips per manager write, with and without a unit of work.
+
+Usage: `python -m benchmarks.round_trips`
+
+Every statement, transaction start and commit sent to PostgreSQL counts as one round trip. `mixed` creates three
+users, updates one and deletes another with a commit per call, `mixed_unit_of_work` runs the same calls inside
+`BaseManager.unit_of_work` so they share one transaction. Requires the PostgreSQL database from `DB_URL` with
+migrations applied.
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.engine import session_manager
+from app.database.models import User
+from app.manager.user import user_manager
+from app.schemas.user import UserCreate, UserUpdate
+from benchmarks.utils import write_report
+
+PASSWORD = "Benchmark1"  # noqa: S105
+
+type Scenario = Callable[[AsyncSession, str, list[int]], Awaitable[Any]]
+
+
+def _user(email_prefix: str) -> UserCreate:
+    return UserCreate(email=f"{email_prefix}-{uuid4().hex[:12]}@example.com", password=PASSWORD)
+
+
+def _changes(email_prefix: str) -> UserUpdate:
+    return UserUpdate(email=f"{email_prefix}-{uuid4().hex[:12]}@example.com")
+
+
+async def _create(session: AsyncSession, email_prefix: str, user_ids: list[int]) -> None:  # noqa: ARG001
+    await user_manager.create(_user(email_prefix), session)
+
+
+async def _update(session: AsyncSession, email_prefix: str, user_ids: list[int]) -> None:
+    await user_manager.update(user_ids[0], _changes(email_prefix), session)
+
+
+async def _delete(session: AsyncSession, email_prefix: str, user_ids: list[int]) -> None:  # noqa: ARG001
+    await user_manager.delete(user_ids[0], session)
+
+
+async def _mixed(session: AsyncSession, email_prefix: str, user_ids: list[int]) -> None:
+    for _ in range(3):
+        await user_manager.create(_user(email_prefix), session)
+
+    await user_manager.update(user_ids[0], _changes(email_prefix), session)
+    await user_manager.delete(user_ids[1], session)
+
+
+async def _mixed_unit_of_work(session: AsyncSession, email_prefix: str, user_ids: list[int]) -> None:
+    async with user_manager.unit_of_work(session):
+        await _mixed(session, email_prefix, user_ids)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "create": _create,
+    "update": _update,
+    "delete": _delete,
+    "mixed": _mixed,
+    "mixed_unit_of_work": _mixed_unit_of_work,
+}
+
+
+def _count(counter: Counter[str], name: str, *_: Any) -> None:
+    counter[name] += 1
+
+
+async def main(args: argparse.Namespace) -> None:
+    email_prefix = f"bench-{uuid4().hex[:8]}"
+    engine = session_manager.engine.sync_engine
+    counter: Counter[str] = Counter()
+    listeners = {name: partial(_count, counter, name) for name in ("before_cursor_execute", "begin", "commit")}
+    report: dict[str, Any] = {"benchmark": "round_trips"}
+
+    try:
+        for name in args.scenarios:
+            async with session_manager.session() as session:
+                users = await user_manager.repository.create_bulk(
+                    [_user(email_prefix).model_dump() for _ in range(2)], session
+                )
+                user_ids = [user.id for user in users]
+
+            async with session_manager.session() as session:
+                for event_name, listener in listeners.items():
+                    event.listen(engine, event_name, listener)
+
+                counter.clear()
+
+                try:
+                    await SCENARIOS[name](session, email_prefix, user_ids)
+                finally:
+                    for event_name, listener in listeners.items():
+                        event.remove(engine, event_name, listener)
+
+                report[name] = {
+                    "statements": counter["before_cursor_execute"],
+                    "commits": counter["commit"],
+                    "round_trips": counter.total(),
+                }
+    finally:
+        async with session_manager.session() as session:
+            await user_manager.delete_bulk(session, filters=[User.email.startswith(email_prefix)])
+
+    write_report(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,91 @@
+"""Measure `GET /users/{userId}` latency while signups hash passwords in the background.
+
+Usage: `python -m benchmarks.signup_latency --duration 10 --signup-workers 8 --readers 16`
+
+Requires the PostgreSQL database from `DB_URL` with migrations applied.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+from uuid import uuid4
+
+from httpx import AsyncClient
+
+from app.database.engine import session_manager
+from app.database.models import User
+from app.manager.user import user_manager
+from benchmarks.utils import asgi_client, latency_summary, write_report
+
+PASSWORD = "Benchmark1"  # noqa: S105
+
+
+async def _signup_worker(client: AsyncClient, email_prefix: str, stop_at: float, counter: list[int]) -> None:
+    while time.perf_counter() < stop_at:
+        response = await client.post(
+            "/users", json={"email": f"{email_prefix}-{uuid4().hex}@example.com", "password": PASSWORD}
+        )
+        response.raise_for_status()
+        counter[0] += 1
+
+
+async def _reader(client: AsyncClient, user_id: int, stop_at: float, samples: list[float]) -> None:
+    while time.perf_counter() < stop_at:
+        started_at = time.perf_counter()
+        response = await client.get(f"/users/{user_id}")
+        samples.append(time.perf_counter() - started_at)
+        response.raise_for_status()
+
+
+async def _read_phase(
+    client: AsyncClient, user_id: int, *, duration: float, readers: int, signup_workers: int, email_prefix: str
+) -> dict[str, Any]:
+    samples: list[float] = []
+    signups = [0]
+    stop_at = time.perf_counter() + duration
+
+    await asyncio.gather(
+        *(_signup_worker(client, email_prefix, stop_at, signups) for _ in range(signup_workers)),
+        *(_reader(client, user_id, stop_at, samples) for _ in range(readers)),
+    )
+    return {
+        "signup_workers": signup_workers,
+        "signups_per_second": signups[0] / duration,
+        "read_latency": latency_summary(samples),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    email_prefix = f"bench-{uuid4().hex[:8]}"
+
+    async with asgi_client() as client:
+        response = await client.post("/users", json={"email": f"{email_prefix}@example.com", "password": PASSWORD})
+        response.raise_for_status()
+        user_id = response.json()["id"]
+
+        try:
+            idle = await _read_phase(
+                client, user_id, duration=args.duration, readers=args.readers, signup_workers=0, email_prefix=""
+            )
+            loaded = await _read_phase(
+                client,
+                user_id,
+                duration=args.duration,
+                readers=args.readers,
+                signup_workers=args.signup_workers,
+                email_prefix=email_prefix,
+            )
+        finally:
+            async with session_manager.session() as session:
+                await user_manager.delete_bulk(session, filters=[User.email.startswith(email_prefix)])
+
+    write_report({"benchmark": "signup_latency", "idle": idle, "with_signups": loaded})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--signup-workers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=16)
+    asyncio.run(main(parser.parse_args()))
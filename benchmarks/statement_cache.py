@@ -0,0 +1,89 @@
+"""Compare per-call CPU time of templated and freshly built repository statements.
+
+Usage: `python -m benchmarks.statement_cache --iterations 5000`
+
+The dynamic variant passes the same lookups as `filters`, which builds a new expression on every call the way the
+repository did before statements were templated by filter shape. Requires the PostgreSQL database from `DB_URL` with
+migrations applied.
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.engine import session_manager
+from app.database.instrumentation import compiled_cache_stats
+from app.database.models import User
+from app.manager.user import user_manager
+from benchmarks.utils import write_report
+
+type Lookup = Callable[[AsyncSession], Awaitable[Any]]
+
+
+async def _run(lookup: Lookup, iterations: int) -> dict[str, float]:
+    compiled_cache_stats.hits = compiled_cache_stats.misses = 0
+
+    async with session_manager.session(read_only=True) as session:
+        started_at = time.process_time()
+
+        for _ in range(iterations):
+            await lookup(session)
+            session.expunge_all()
+
+        elapsed = time.process_time() - started_at
+
+    return {"cpu_us_per_call": elapsed / iterations * 1_000_000, "cache_hit_rate": compiled_cache_stats.hit_rate}
+
+
+async def main(args: argparse.Namespace) -> None:
+    repository = user_manager.repository
+    email = f"bench-{uuid4().hex[:8]}@example.com"
+    now = datetime.now(UTC)
+
+    async with session_manager.session() as session:
+        (user,) = await repository.create_bulk(
+            [{"email": email, "password": "", "created_at": now, "updated_at": now}], session
+        )
+        user_id = user.id
+
+    lookups: dict[str, tuple[Lookup, Lookup]] = {
+        "fetch_one_by_id": (
+            lambda session: repository.fetch_one(filters=[User.id == user_id], session=session),
+            lambda session: repository.fetch_one(id=user_id, session=session),
+        ),
+        "exists_by_email": (
+            lambda session: repository.exists(session, filters=[User.email == email]),
+            lambda session: repository.exists(session, email=email),
+        ),
+    }
+    report: dict[str, Any] = {"benchmark": "statement_cache", "iterations": args.iterations}
+
+    try:
+        for name, (dynamic, templated) in lookups.items():
+            await _run(dynamic, args.warmup)
+            await _run(templated, args.warmup)
+            report[name] = {
+                "dynamic": await _run(dynamic, args.iterations),
+                "templated": await _run(templated, args.iterations),
+            }
+            report[name]["cpu_reduction"] = (
+                1 - report[name]["templated"]["cpu_us_per_call"] / report[name]["dynamic"]["cpu_us_per_call"]
+            )
+    finally:
+        async with session_manager.session() as session:
+            await repository.delete_bulk(session=session, id=user_id)
+
+    write_report(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,46 @@
+import json
+import logging
+import statistics
+import sys
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from typing import Any
+
+from httpx import ASGITransport, AsyncClient
+
+
+@asynccontextmanager
+async def asgi_client() -> AsyncIterator[AsyncClient]:
+    from app.settings import settings  # noqa: PLC0415
+
+    # Every in-process request comes from the same client address, so the limiter would throttle the load itself.
+    settings.rate_limit_enabled = False
+
+    from app.main import app  # noqa: PLC0415
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    async with (
+        app.router.lifespan_context(app),
+        AsyncClient(transport=ASGITransport(app=app), base_url="http://benchmark") as client,
+    ):
+        yield client
+
+
+def latency_summary(samples_s: Sequence[float]) -> dict[str, float]:
+    if len(samples_s) < 2:  # noqa: PLR2004
+        return {"count": len(samples_s)}
+
+    cut_points = statistics.quantiles(samples_s, n=100, method="inclusive")
+    return {
+        "count": len(samples_s),
+        "mean_ms": statistics.fmean(samples_s) * 1000,
+        "p50_ms": cut_points[49] * 1000,
+        "p95_ms": cut_points[94] * 1000,
+        "p99_ms": cut_points[98] * 1000,
+        "max_ms": max(samples_s) * 1000,
+    }
+
+
+def write_report(report: dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")